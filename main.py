@@ -6,16 +6,28 @@ My Schedule - Google Calendarの空き時間検索ツール
 平日の営業時間（10:00-18:00）内で、指定した最小時間以上の空き時間を見つけることができます。
 """
 from __future__ import print_function
+import asyncio
 import httplib2
 import os
 import sys
 import datetime
 import json
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlencode
 from dateutil import parser as date_parser
 import pytz
+import aiohttp
 import argparse
+from collections import OrderedDict
 
 from apiclient import discovery
+from apiclient.errors import HttpError
 from oauth2client import client
 from oauth2client import tools
 from oauth2client.file import Storage
@@ -39,7 +51,56 @@ BUFFER_MINUTES = 30        # 予定の前後のバッファー時間（分）
 DEFAULT_MIN_HOURS = 1.0    # デフォルトの最小空き時間（時間）
 DEFAULT_DAYS_AHEAD = 14    # デフォルトの検索期間（日）
 
+# APIリクエスト制御関連
+API_RATE_LIMIT_PER_SECOND = 10.0  # 1秒あたりのリクエスト数（ユーザー単位クォータ: 600回/分）
+API_RATE_LIMIT_BURST = 10         # 連続して送信できる最大リクエスト数
+API_MAX_RETRIES = 5               # リトライ可能なエラーの最大リトライ回数
+API_BACKOFF_BASE_SECONDS = 1.0    # 指数バックオフの基準待機時間（秒）
+API_BACKOFF_MAX_SECONDS = 32.0    # 指数バックオフの最大待機時間（秒）
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+# 非同期クライアント関連
+CALENDAR_API_BASE_URL = "https://www.googleapis.com/calendar/v3"
+ASYNC_MAX_CONNECTIONS = 10        # 同時に使用する最大接続数（同時実行数の上限）
+ASYNC_REQUEST_TIMEOUT = 30.0      # 1リクエストあたりのタイムアウト（秒）
+
+# プッシュ通知関連
+WATCH_CHANNEL_TTL_SECONDS = 7 * 24 * 60 * 60  # 通知チャンネルの有効期間（秒）
+WATCH_LISTEN_HOST = "0.0.0.0"                 # Webhook受信サーバーの待ち受けアドレス
+WATCH_LISTEN_PORT = 8080                      # Webhook受信サーバーの待ち受けポート
+WATCH_RENEW_MARGIN_SECONDS = 60 * 60          # 有効期限のどれだけ前にチャンネルを作り直すか（秒）
+WATCH_RENEW_RETRY_SECONDS = 60                # チャンネルの作り直しに失敗した場合の再試行間隔（秒）
+
+# 先読み関連
+PREFETCH_CACHE_SIZE = 8      # 先読みした検索期間を保持する最大数
+INTERACTIVE_PAGE_DAYS = 7    # 対話モードで1ページに表示する日数
+
+# 稼働状況分析関連
+ANALYTICS_DEFAULT_DAYS = 365           # デフォルトの分析期間（過去の日数）
+ANALYTICS_CHUNK_DAYS = 30              # イベントを分割取得する期間（日）
+ANALYTICS_PAGE_SIZE = 2500             # 1リクエストあたりの最大取得件数
+ANALYTICS_PERCENTILES = (50, 75, 90, 95)
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
 # 引数解析のための共通パーサー設定
+def positive_int(value):
+    """1以上の整数の引数を解析する
+
+    Args:
+        value: 引数の文字列
+
+    Returns:
+        整数値
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"整数を指定してください: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+    return number
+
 def setup_arg_parser():
     """コマンドライン引数パーサーを設定する"""
     parser = argparse.ArgumentParser(
@@ -75,6 +136,35 @@ def setup_arg_parser():
         action="store_true",
         help="祝日を検索結果に含める（デフォルトでは除外）",
     )
+    parser.add_argument(
+        "--show-api-metrics",
+        action="store_true",
+        help="APIリクエストのリトライ・スロットリング回数を標準エラー出力に表示する",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="URL",
+        help="予定の変更通知を受け取るWebhookのURL（--available-slotsと併用、変更のあった日だけ再計算する）",
+    )
+    parser.add_argument(
+        "--listen-port",
+        type=int,
+        default=WATCH_LISTEN_PORT,
+        help=f"Webhook受信サーバーの待ち受けポート（デフォルト: {WATCH_LISTEN_PORT}）",
+    )
+    parser.add_argument(
+        "--interactive", "-i",
+        action="store_true",
+        help=f"{INTERACTIVE_PAGE_DAYS}日ずつページ送りしながら空き時間を表示する（次の期間を先読みする）",
+    )
+    parser.add_argument(
+        "--analytics",
+        nargs="?",
+        const=ANALYTICS_DEFAULT_DAYS,
+        type=positive_int,
+        metavar="DAYS",
+        help=f"過去N日間の稼働状況（曜日・時間帯別の予定率、会議負荷、空き時間の推移）を集計する（デフォルト: {ANALYTICS_DEFAULT_DAYS}日）",
+    )
     return parser
 
 
@@ -83,6 +173,10 @@ def get_jst_timezone():
     """JSTタイムゾーンを取得する"""
     return pytz.timezone(JST_TIMEZONE)
 
+def get_now_jst():
+    """現在時刻をJSTタイムゾーンで取得する"""
+    return datetime.datetime.now(get_jst_timezone())
+
 def to_jst(dt):
     """日時をJSTタイムゾーンに変換する
     
@@ -117,6 +211,22 @@ def to_utc_str(dt):
         
     return dt.isoformat()
 
+def parse_datetime(value):
+    """APIが返す日時文字列をdatetimeオブジェクトに変換する
+
+    RFC3339形式は高速なISO 8601パーサーで解析し、それ以外の形式は汎用パーサーで解析する。
+
+    Args:
+        value: 日時文字列
+
+    Returns:
+        datetimeオブジェクト
+    """
+    try:
+        return date_parser.isoparse(value)
+    except ValueError:
+        return date_parser.parse(value)
+
 def get_day_start_end(date):
     """指定された日の開始と終了時刻を取得する
     
@@ -154,6 +264,372 @@ def get_business_hours(date):
     
     return day_start, day_end, effective_start, effective_end
 
+# APIリクエスト制御
+def get_error_reasons(error):
+    """HttpErrorのレスポンス本文からエラー理由（reason）のリストを取得する
+
+    Args:
+        error: HttpErrorオブジェクト
+
+    Returns:
+        エラー理由の文字列リスト（取得できない場合は空リスト）
+    """
+    content = error.content
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", "replace")
+
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return []
+
+    if not isinstance(data, dict) or not isinstance(data.get("error"), dict):
+        return []
+
+    return [
+        detail.get("reason")
+        for detail in data["error"].get("errors", [])
+        if isinstance(detail, dict)
+    ]
+
+def is_rate_limit_error(error):
+    """クォータ超過によるエラーかどうかを判定する
+
+    Args:
+        error: 発生した例外
+
+    Returns:
+        429、またはreasonがレート制限の403の場合はTrue
+    """
+    if not isinstance(error, HttpError):
+        return False
+
+    status = error.resp.status
+    if status == 429:
+        return True
+
+    return status == 403 and any(
+        reason in RATE_LIMIT_REASONS for reason in get_error_reasons(error)
+    )
+
+def is_retryable_error(error):
+    """リトライすべきエラーかどうかを判定する
+
+    Args:
+        error: 発生した例外
+
+    Returns:
+        レート制限・サーバーエラー・通信エラーの場合はTrue
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUS_CODES or is_rate_limit_error(error)
+
+    # asyncio.TimeoutErrorはPython 3.11より前はsocket.timeoutと別の例外
+    return isinstance(error, (ConnectionError, socket.timeout, asyncio.TimeoutError))
+
+def compute_backoff_delay(attempt, base=API_BACKOFF_BASE_SECONDS,
+                          maximum=API_BACKOFF_MAX_SECONDS, rand=random.random):
+    """ジッター付き指数バックオフの待機時間を計算する
+
+    Args:
+        attempt: リトライ回数（0始まり）
+        base: 基準待機時間（秒）
+        maximum: 最大待機時間（秒）
+        rand: 0以上1未満の乱数を返す関数
+
+    Returns:
+        待機時間（秒）
+    """
+    # Full Jitter: 0〜min(maximum, base * 2^attempt) の一様乱数
+    return rand() * min(maximum, base * (2 ** attempt))
+
+def get_retry_after(error):
+    """Retry-Afterヘッダーで指定された待機時間を取得する
+
+    Args:
+        error: 発生した例外
+
+    Returns:
+        待機時間（秒）。指定がない場合は0
+    """
+    resp = getattr(error, "resp", None)
+    if resp is None or not hasattr(resp, "get"):
+        return 0.0
+
+    try:
+        return max(0.0, float(resp.get("retry-after", 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TokenBucket:
+    """トークンバケット方式のレートリミッター
+
+    トークンを前借りする方式で、呼び出し側が待機すべき秒数を返す。
+    待機自体は呼び出し側が行うため、スレッドとasyncioのどちらからでも利用できる。
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """
+        Args:
+            rate: 1秒あたりに補充されるトークン数
+            capacity: バケットの容量（連続して送信できる最大リクエスト数）
+            clock: 単調増加する現在時刻（秒）を返す関数
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """トークンを1つ予約する
+
+        Returns:
+            トークンが利用可能になるまでの待機時間（秒）。すぐに利用できる場合は0
+        """
+        with self._lock:
+            now = self.clock()
+            elapsed = max(0.0, now - self.updated)
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RequestScheduler:
+    """Google Calendar APIリクエストを一元的に実行するスケジューラ
+
+    - トークンバケットによるレート制限
+    - レート制限・サーバーエラー時のジッター付き指数バックオフ
+    - 同一キーで実行中のリクエストの合流（重複リクエストの抑制）
+    """
+
+    def __init__(self, rate=API_RATE_LIMIT_PER_SECOND, burst=API_RATE_LIMIT_BURST,
+                 max_retries=API_MAX_RETRIES, backoff_base=API_BACKOFF_BASE_SECONDS,
+                 backoff_max=API_BACKOFF_MAX_SECONDS, clock=time.monotonic,
+                 sleep=time.sleep, rand=random.random):
+        """
+        Args:
+            rate: 1秒あたりのリクエスト数
+            burst: 連続して送信できる最大リクエスト数
+            max_retries: 最大リトライ回数
+            backoff_base: 指数バックオフの基準待機時間（秒）
+            backoff_max: 指数バックオフの最大待機時間（秒）
+            clock: 単調増加する現在時刻（秒）を返す関数
+            sleep: 指定秒数待機する関数
+            rand: 0以上1未満の乱数を返す関数
+        """
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.rand = rand
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._metrics = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "throttled_seconds": 0.0,
+            "rate_limit_errors": 0,
+            "coalesced": 0,
+            "failures": 0,
+        }
+
+    def _record(self, name, value=1):
+        """メトリクスを加算する"""
+        with self._lock:
+            self._metrics[name] += value
+
+    def get_metrics(self):
+        """メトリクスのスナップショットを取得する
+
+        Returns:
+            リクエスト数・リトライ回数・スロットリング回数などを含む辞書
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def execute(self, request, key=None, retry=True):
+        """リクエストを実行する
+
+        同じkeyのリクエストが実行中の場合は新たに送信せず、その結果を共有する。
+
+        Args:
+            request: execute()メソッドを持つAPIリクエストオブジェクト
+            key: リクエストを識別するハッシュ可能な値（Noneの場合は合流しない）
+            retry: エラー時にリトライするかどうか（冪等でないリクエストではFalseを指定する）
+
+        Returns:
+            APIレスポンス
+        """
+        if key is None:
+            return self._execute_with_retry(request, retry)
+
+        with self._lock:
+            pending = self._in_flight.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = futures.Future()
+                self._in_flight[key] = pending
+            else:
+                self._metrics["coalesced"] += 1
+
+        if not is_owner:
+            return pending.result()
+
+        try:
+            result = self._execute_with_retry(request, retry)
+        except BaseException as error:
+            pending.set_exception(error)
+            raise
+        else:
+            pending.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _reserve(self):
+        """レート制限のトークンを予約し、待機すべき秒数を返す"""
+        wait = self.bucket.reserve()
+        if wait > 0:
+            self._record("throttled")
+            self._record("throttled_seconds", wait)
+        return wait
+
+    def _retry_delay(self, error, attempt, retry=True):
+        """エラー発生時のリトライまでの待機時間を決定する
+
+        Returns:
+            待機時間（秒）。リトライしない場合はNone
+        """
+        if is_rate_limit_error(error):
+            self._record("rate_limit_errors")
+        if not retry or attempt >= self.max_retries or not is_retryable_error(error):
+            self._record("failures")
+            return None
+
+        self._record("retries")
+        return max(
+            compute_backoff_delay(attempt, self.backoff_base, self.backoff_max, self.rand),
+            get_retry_after(error),
+        )
+
+    def _execute_with_retry(self, request, retry=True):
+        """リトライ付きでリクエストを実行する"""
+        attempt = 0
+        while True:
+            wait = self._reserve()
+            if wait > 0:
+                self.sleep(wait)
+            self._record("requests")
+            try:
+                return request.execute()
+            except Exception as error:
+                delay = self._retry_delay(error, attempt, retry)
+                if delay is None:
+                    raise
+                self.sleep(delay)
+                attempt += 1
+
+    async def execute_async(self, send, key=None):
+        """リクエストをasyncioで実行する
+
+        レート制限・リトライ・合流の扱いはexecute()と同じ。待機はイベントループ上で行う。
+
+        Args:
+            send: リクエストを送信してレスポンスを返すコルーチン関数
+            key: リクエストを識別するハッシュ可能な値（Noneの場合は合流しない）
+
+        Returns:
+            APIレスポンス
+        """
+        if key is None:
+            return await self._execute_with_retry_async(send)
+
+        loop = asyncio.get_running_loop()
+        in_flight_key = (loop, key)
+        with self._lock:
+            task = self._in_flight.get(in_flight_key)
+            if task is None:
+                task = loop.create_task(self._execute_with_retry_async(send))
+                self._in_flight[in_flight_key] = task
+                task.add_done_callback(lambda _: self._finish_async(in_flight_key))
+            else:
+                self._metrics["coalesced"] += 1
+
+        # 合流した呼び出し元がキャンセルされても共有のリクエストは継続する
+        return await asyncio.shield(task)
+
+    def _finish_async(self, in_flight_key):
+        """完了した非同期リクエストを実行中の一覧から外す"""
+        with self._lock:
+            self._in_flight.pop(in_flight_key, None)
+
+    async def _execute_with_retry_async(self, send):
+        """リトライ付きでリクエストをasyncioで実行する"""
+        attempt = 0
+        while True:
+            wait = self._reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._record("requests")
+            try:
+                return await send()
+            except Exception as error:
+                delay = self._retry_delay(error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+_request_scheduler = None
+_request_scheduler_lock = threading.Lock()
+
+def get_request_scheduler():
+    """共有のリクエストスケジューラを取得する（初回呼び出し時に作成）"""
+    global _request_scheduler
+    with _request_scheduler_lock:
+        if _request_scheduler is None:
+            _request_scheduler = RequestScheduler()
+        return _request_scheduler
+
+def execute_request(request, key=None, retry=True):
+    """共有のリクエストスケジューラ経由でAPIリクエストを実行する
+
+    Args:
+        request: execute()メソッドを持つAPIリクエストオブジェクト
+        key: 実行中リクエストの合流に使うキー
+        retry: エラー時にリトライするかどうか
+
+    Returns:
+        APIレスポンス
+    """
+    return get_request_scheduler().execute(request, key=key, retry=retry)
+
+def list_events(service, **params):
+    """events().listをスケジューラ経由で実行する
+
+    同じパラメータのリクエストが実行中の場合は結果を共有する。
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        **params: events().listに渡すパラメータ
+
+    Returns:
+        APIレスポンス（辞書）
+    """
+    request = service.events().list(**params)
+    key = ("events.list",) + tuple(sorted(params.items()))
+    return execute_request(request, key=key)
+
 def is_holiday(service, date):
     """指定された日が祝日かどうかを判定する
     
@@ -172,20 +648,68 @@ def is_holiday(service, date):
     end_str = to_utc_str(end_date)
     
     # 祝日カレンダーを照会
-    events_result = (
-        service.events()
-        .list(
-            calendarId=HOLIDAY_CALENDAR_ID,
-            timeMin=start_str,
-            timeMax=end_str,
-            singleEvents=True,
-        )
-        .execute()
+    events_result = list_events(
+        service,
+        calendarId=HOLIDAY_CALENDAR_ID,
+        timeMin=start_str,
+        timeMax=end_str,
+        singleEvents=True,
     )
     
     events = events_result.get("items", [])
     return len(events) > 0
 
+def parse_holiday_dates(events):
+    """祝日カレンダーのイベントリストから祝日の日付を取得する
+
+    Args:
+        events: 祝日カレンダーのイベントリスト
+
+    Returns:
+        祝日の日付（dateオブジェクト）のset
+    """
+    holidays = set()
+    for event in events:
+        start = event["start"].get("date")
+        if start:
+            # 終日イベント（終了日は含まない）
+            day = date_parser.parse(start).date()
+            end = event["end"].get("date")
+            last = date_parser.parse(end).date() if end else day + datetime.timedelta(days=1)
+            while day < last:
+                holidays.add(day)
+                day += datetime.timedelta(days=1)
+        elif event["start"].get("dateTime"):
+            holidays.add(to_jst(parse_datetime(event["start"]["dateTime"])).date())
+    return holidays
+
+def get_holiday_dates(service, start_date, end_date):
+    """指定期間内の祝日の日付を取得する
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+
+    Returns:
+        祝日の日付（dateオブジェクト）のset
+    """
+    params = {
+        "calendarId": HOLIDAY_CALENDAR_ID,
+        "timeMin": to_utc_str(start_date),
+        "timeMax": to_utc_str(end_date),
+        "singleEvents": True,
+    }
+    holidays = set()
+    while True:
+        events_result = list_events(service, **params)
+        holidays |= parse_holiday_dates(events_result.get("items", []))
+
+        page_token = events_result.get("nextPageToken")
+        if not page_token:
+            return holidays
+        params["pageToken"] = page_token
+
 def get_credentials(args=None):
     """Google APIの認証情報を取得する
     
@@ -237,20 +761,65 @@ def get_calendar_events(service, start_date, end_date):
     end_str = to_utc_str(end_date)
     
     # イベント取得
-    events_result = (
-        service.events()
-        .list(
-            calendarId=PRIMARY_CALENDAR_ID,
-            timeMin=start_str,
-            timeMax=end_str,
-            singleEvents=True,
-            orderBy="startTime",
-        )
-        .execute()
+    events_result = list_events(
+        service,
+        calendarId=PRIMARY_CALENDAR_ID,
+        timeMin=start_str,
+        timeMax=end_str,
+        singleEvents=True,
+        orderBy="startTime",
     )
     
     return events_result.get("items", [])
 
+def iter_calendar_events(service, start_date, end_date, chunk_days=ANALYTICS_CHUNK_DAYS):
+    """長期間のカレンダーイベントを期間ごとに分割して順に取得する
+
+    すべてのイベントをメモリに保持せずに処理できるよう、開始時刻順にイベントを返す。
+    分割期間の境界をまたぐイベントは一度だけ返す。
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+        chunk_days: 1回に取得する期間（日）
+
+    Yields:
+        Google Calendarイベント
+    """
+    start_date_jst = to_jst(start_date)
+    end_date_jst = to_jst(end_date)
+
+    previous_ids = set()
+    chunk_start = start_date_jst
+    while chunk_start < end_date_jst:
+        chunk_end = min(chunk_start + datetime.timedelta(days=chunk_days), end_date_jst)
+        params = {
+            "calendarId": PRIMARY_CALENDAR_ID,
+            "timeMin": to_utc_str(chunk_start),
+            "timeMax": to_utc_str(chunk_end),
+            "singleEvents": True,
+            "orderBy": "startTime",
+            "maxResults": ANALYTICS_PAGE_SIZE,
+        }
+
+        chunk_ids = set()
+        while True:
+            events_result = list_events(service, **params)
+            for event in events_result.get("items", []):
+                chunk_ids.add(event.get("id"))
+                # 前の期間で返したイベントはスキップ
+                if event.get("id") not in previous_ids:
+                    yield event
+
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                break
+            params["pageToken"] = page_token
+
+        previous_ids = chunk_ids
+        chunk_start = chunk_end
+
 def parse_busy_periods(events):
     """イベントリストから予定時間（ビジー期間）リストを作成する
     
@@ -271,8 +840,8 @@ def parse_busy_periods(events):
             continue
             
         # 日時をJSTに変換
-        start_jst = to_jst(date_parser.parse(start))
-        end_jst = to_jst(date_parser.parse(end))
+        start_jst = to_jst(parse_datetime(start))
+        end_jst = to_jst(parse_datetime(end))
         
         busy_periods.append((start_jst, end_jst))
         
@@ -290,6 +859,125 @@ def calculate_duration_hours(start, end):
     """
     return (end - start).total_seconds() / 3600
 
+def get_event_dates(event):
+    """イベントが空き時間計算に影響する日付を取得する
+
+    空き時間は開始日（JST）の予定として計算されるため、時刻指定イベントの開始日を返す。
+
+    Args:
+        event: Google Calendarイベント
+
+    Returns:
+        日付（dateオブジェクト）のset。終日イベントの場合は空set
+    """
+    start = event.get("start", {}).get("dateTime")
+    if not start:
+        return set()
+    return {to_jst(parse_datetime(start)).date()}
+
+def group_busy_periods_by_date(busy_periods):
+    """予定時間リストを開始日（JST）ごとにまとめる
+
+    Args:
+        busy_periods: (start, end)形式のタプルリスト（JSTタイムゾーン）
+
+    Returns:
+        開始日をキー、予定時間リストを値とする辞書
+    """
+    grouped = {}
+    for start, end in busy_periods:
+        grouped.setdefault(start.date(), []).append((start, end))
+    return grouped
+
+def find_day_slots(current_date, busy_periods, now_jst, min_hours=DEFAULT_MIN_HOURS):
+    """指定された1日の営業時間内の空き時間を検索する
+
+    Args:
+        current_date: 対象日の0:00（JSTタイムゾーンのdatetimeオブジェクト）
+        busy_periods: 予定時間リスト（対象日以外の予定を含んでもよい）
+        now_jst: 現在時刻（JSTタイムゾーン）
+        min_hours: 最小空き時間（時間単位）
+
+    Returns:
+        利用可能な時間枠のリスト（各要素はstart, end, durationを含む辞書）
+    """
+    available_slots = []
+
+    # 営業時間を取得
+    day_start, day_end, effective_day_start, effective_day_end = get_business_hours(current_date)
+    
+    # 過去の日はスキップ
+    if day_end < now_jst:
+        return available_slots
+        
+    # 現在日時が営業時間内の場合、開始時間を現在時刻に調整
+    if (now_jst > effective_day_start and 
+        now_jst < effective_day_end and 
+        current_date.date() == now_jst.date()):
+        effective_day_start = now_jst
+        
+    # この日の予定を抽出
+    day_busy_periods = [
+        (max(day_start, start), min(day_end, end))
+        for start, end in busy_periods
+        if start.date() == current_date.date()
+        and end > day_start
+        and start < day_end
+    ]
+    
+    # 開始時間でソート
+    day_busy_periods.sort(key=lambda x: x[0])
+    
+    # 空き時間を検索
+    if not day_busy_periods:
+        # 予定がなければ1日すべて空き
+        duration = calculate_duration_hours(effective_day_start, effective_day_end)
+        available_slots.append({
+            'start': effective_day_start,
+            'end': effective_day_end,
+            'duration': duration
+        })
+    else:
+        # 最初の予定より前の時間
+        min_duration_timedelta = datetime.timedelta(hours=min_hours)
+        if day_busy_periods[0][0] > effective_day_start + min_duration_timedelta:
+            # バッファを適用
+            gap_end = day_busy_periods[0][0] - datetime.timedelta(minutes=BUFFER_MINUTES)
+            duration = calculate_duration_hours(effective_day_start, gap_end)
+            available_slots.append({
+                'start': effective_day_start,
+                'end': gap_end,
+                'duration': duration
+            })
+            
+        # 予定と予定の間の時間
+        for i in range(len(day_busy_periods) - 1):
+            # バッファを適用
+            gap_start = day_busy_periods[i][1] + datetime.timedelta(minutes=BUFFER_MINUTES)
+            gap_end = day_busy_periods[i + 1][0] - datetime.timedelta(minutes=BUFFER_MINUTES)
+            
+            # 最小時間以上の空きがあるか確認
+            if gap_end - gap_start >= min_duration_timedelta:
+                duration = calculate_duration_hours(gap_start, gap_end)
+                available_slots.append({
+                    'start': gap_start,
+                    'end': gap_end,
+                    'duration': duration
+                })
+                
+        # 最後の予定より後の時間
+        if effective_day_end > day_busy_periods[-1][1] + min_duration_timedelta:
+            # バッファを適用
+            gap_start = day_busy_periods[-1][1] + datetime.timedelta(minutes=BUFFER_MINUTES)
+            duration = calculate_duration_hours(gap_start, effective_day_end)
+            available_slots.append({
+                'start': gap_start,
+                'end': effective_day_end,
+                'duration': duration
+            })
+
+    return available_slots
+
 def find_available_slots(service, start_date, end_date, include_holidays=False, min_hours=DEFAULT_MIN_HOURS):
     """営業時間内（平日10:00-18:00）で、指定した最小時間以上の空き時間を検索する
     
@@ -304,8 +992,7 @@ def find_available_slots(service, start_date, end_date, include_holidays=False,
         利用可能な時間枠のリスト（各要素はstart, end, durationを含む辞書）
     """
     # 現在時刻（JST）
-    jst = get_jst_timezone()
-    now_jst = datetime.datetime.now(jst)
+    now_jst = get_now_jst()
     
     # 入力日時をJSTに変換
     start_date_jst = to_jst(start_date)
@@ -318,8 +1005,8 @@ def find_available_slots(service, start_date, end_date, include_holidays=False,
     # カレンダーイベントを取得
     events = get_calendar_events(service, start_date_jst, end_date_jst)
     
-    # 予定時間リストを作成
-    busy_periods = parse_busy_periods(events)
+    # 予定時間リストを作成し、開始日ごとにまとめる
+    busy_periods_by_date = group_busy_periods_by_date(parse_busy_periods(events))
     
     # 検索開始日を日の始めに調整
     current_date = start_date_jst.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -335,79 +1022,12 @@ def find_available_slots(service, start_date, end_date, include_holidays=False,
                 current_date += datetime.timedelta(days=1)
                 continue
                 
-            # 営業時間を取得
-            day_start, day_end, effective_day_start, effective_day_end = get_business_hours(current_date)
-            
-            # 過去の日はスキップ
-            if day_end < now_jst:
-                current_date += datetime.timedelta(days=1)
-                continue
-                
-            # 現在日時が営業時間内の場合、開始時間を現在時刻に調整
-            if (now_jst > effective_day_start and 
-                now_jst < effective_day_end and 
-                current_date.date() == now_jst.date()):
-                effective_day_start = now_jst
-                
-            # この日の予定を抽出
-            day_busy_periods = [
-                (max(day_start, start), min(day_end, end))
-                for start, end in busy_periods
-                if start.date() == current_date.date()
-                and end > day_start
-                and start < day_end
-            ]
-            
-            # 開始時間でソート
-            day_busy_periods.sort(key=lambda x: x[0])
-            
-            # 空き時間を検索
-            if not day_busy_periods:
-                # 予定がなければ1日すべて空き
-                duration = calculate_duration_hours(effective_day_start, effective_day_end)
-                available_slots.append({
-                    'start': effective_day_start,
-                    'end': effective_day_end,
-                    'duration': duration
-                })
-            else:
-                # 最初の予定より前の時間
-                min_duration_timedelta = datetime.timedelta(hours=min_hours)
-                if day_busy_periods[0][0] > effective_day_start + min_duration_timedelta:
-                    # バッファを適用
-                    gap_end = day_busy_periods[0][0] - datetime.timedelta(minutes=BUFFER_MINUTES)
-                    duration = calculate_duration_hours(effective_day_start, gap_end)
-                    available_slots.append({
-                        'start': effective_day_start,
-                        'end': gap_end,
-                        'duration': duration
-                    })
-                    
-                # 予定と予定の間の時間
-                for i in range(len(day_busy_periods) - 1):
-                    # バッファを適用
-                    gap_start = day_busy_periods[i][1] + datetime.timedelta(minutes=BUFFER_MINUTES)
-                    gap_end = day_busy_periods[i + 1][0] - datetime.timedelta(minutes=BUFFER_MINUTES)
-                    
-                    # 最小時間以上の空きがあるか確認
-                    if gap_end - gap_start >= min_duration_timedelta:
-                        duration = calculate_duration_hours(gap_start, gap_end)
-                        available_slots.append({
-                            'start': gap_start,
-                            'end': gap_end,
-                            'duration': duration
-                        })
-                        
-                # 最後の予定より後の時間
-                if effective_day_end > day_busy_periods[-1][1] + min_duration_timedelta:
-                    # バッファを適用
-                    gap_start = day_busy_periods[-1][1] + datetime.timedelta(minutes=BUFFER_MINUTES)
-                    duration = calculate_duration_hours(gap_start, effective_day_end)
-                    available_slots.append({
-                        'start': gap_start,
-                        'end': effective_day_end,
-                        'duration': duration
-                    })
+            available_slots.extend(find_day_slots(
+                current_date,
+                busy_periods_by_date.get(current_date.date(), []),
+                now_jst,
+                min_hours
+            ))
                     
         # 次の日へ
         current_date += datetime.timedelta(days=1)
@@ -415,36 +1035,1352 @@ def find_available_slots(service, start_date, end_date, include_holidays=False,
     return available_slots
 
 
-def format_output_json(slots):
-    """空き時間リストをJSON形式でフォーマットする
-    
-    Args:
-        slots: 空き時間リスト
-        
-    Returns:
-        JSON形式の文字列
+class AvailabilityCache:
+    """空き時間の計算結果を日単位でキャッシュする
+
+    初回はrefresh()で検索期間全体を計算し、以降はapply_changes()で
+    前回の同期以降に変更されたイベントだけを取得して、影響する日のみ再計算する。
+    検索期間は現在時刻に合わせて同じ長さのまま先に進み、今日の空き時間は
+    参照・更新のたびに現在時刻で計算し直すため、常駐プロセスでも使い続けられる。
     """
-    return json.dumps({
-        'slots': [
-            {
-                'start': slot['start'].isoformat(),
-                'end': slot['end'].isoformat(),
-                'duration': slot['duration']
+
+    def __init__(self, service, start_date, end_date, include_holidays=False,
+                 min_hours=DEFAULT_MIN_HOURS):
+        """
+        Args:
+            service: Google Calendar API サービスオブジェクト
+            start_date: 検索開始日時（datetimeオブジェクト）
+            end_date: 検索終了日時（datetimeオブジェクト）
+            include_holidays: 祝日を含めるかどうか
+            min_hours: 最小空き時間（時間単位）
+        """
+        self.service = service
+        self.start_date = to_jst(start_date)
+        self.end_date = to_jst(end_date)
+        self.horizon = None
+        self.include_holidays = include_holidays
+        self.min_hours = min_hours
+        self.events = {}
+        self.day_slots = {}
+        self.holidays = {}
+        self.sync_token = None
+        self.covered_end = None
+        self._today = None
+        self._lock = threading.RLock()
+
+    def _list_all_events(self, **params):
+        """ページングしながらイベントを全件取得する
+
+        Returns:
+            (events, next_sync_token)のタプル
+        """
+        events = []
+        page_token = None
+        while True:
+            if page_token:
+                params["pageToken"] = page_token
+            events_result = list_events(
+                self.service,
+                calendarId=PRIMARY_CALENDAR_ID,
+                singleEvents=True,
+                **params
+            )
+            events.extend(events_result.get("items", []))
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                return events, events_result.get("nextSyncToken")
+
+    def _current_range(self, now_jst):
+        """現在時刻に合わせた検索期間を取得する
+
+        開始日時を過ぎている場合は現在時刻から開始し、終了日時も初回計算時の期間の長さを
+        保つように先に進める。
+
+        Returns:
+            (start, end)のタプル（JSTタイムゾーン）
+        """
+        start = max(self.start_date, now_jst)
+        return start, max(self.end_date, start + self.horizon)
+
+    @staticmethod
+    def _search_dates(start, end):
+        """期間内の日付リストを取得する"""
+        current = start.date()
+        dates = []
+        while current <= end.date():
+            dates.append(current)
+            current += datetime.timedelta(days=1)
+        return dates
+
+    def _is_holiday(self, current_date):
+        """祝日判定（結果を日付ごとにキャッシュする）"""
+        day = current_date.date()
+        if day not in self.holidays:
+            self.holidays[day] = is_holiday(self.service, current_date)
+        return self.holidays[day]
+
+    def _recompute_days(self, dates, now_jst):
+        """指定された日の空き時間を再計算する"""
+        if not dates:
+            return
+
+        jst = get_jst_timezone()
+        start, end = self._current_range(now_jst)
+        dates = set(dates)
+        # APIのtimeMin/timeMaxと同様に、検索期間と重なる予定だけを対象とする
+        busy_periods = [
+            (busy_start, busy_end)
+            for busy_start, busy_end in parse_busy_periods(
+                event for event in self.events.values()
+                if get_event_dates(event) & dates
+            )
+            if busy_end > start and busy_start < end
+        ]
+        # 同期トークンで取得したイベントは順不同のため、orderBy=startTimeと同じ順に並べる
+        # （開始時刻が同じ予定の順序で結果が変わらないよう、終了時刻順にそろえる）
+        busy_periods.sort()
+        busy_periods_by_date = group_busy_periods_by_date(busy_periods)
+
+        for day in dates:
+            current_date = jst.localize(datetime.datetime.combine(day, datetime.time()))
+
+            # 平日（月〜金）のみ、祝日は指定がない限り除外
+            if current_date.weekday() >= 5 or (
+                not self.include_holidays and self._is_holiday(current_date)
+            ):
+                self.day_slots[day] = []
+                continue
+
+            self.day_slots[day] = find_day_slots(
+                current_date,
+                busy_periods_by_date.get(day, []),
+                now_jst,
+                self.min_hours
+            )
+
+    def _advance(self, now_jst):
+        """検索期間を現在時刻に合わせて進める
+
+        過ぎた日の結果とイベントを破棄し、期間の終わりが延びた場合は
+        新しく含まれる期間のイベントを取得する。
+
+        Returns:
+            再計算が必要な日付のset（今日と新しく含まれた日）
+        """
+        start, end = self._current_range(now_jst)
+        today = start.date()
+
+        # 日付が変わったときだけ過ぎた日を破棄する
+        if today != self._today:
+            for day in [day for day in self.day_slots if day < today]:
+                del self.day_slots[day]
+            for event_id in [
+                event_id for event_id, event in self.events.items()
+                if all(day < today for day in get_event_dates(event))
+            ]:
+                del self.events[event_id]
+            self._today = today
+
+        dates = {today}
+        if end > self.covered_end:
+            events, _ = self._list_all_events(
+                timeMin=to_utc_str(self.covered_end),
+                timeMax=to_utc_str(end),
+            )
+            for event in events:
+                if event.get("status") != "cancelled":
+                    self.events[event["id"]] = event
+            # 以前の終了日もそれ以降に始まる予定が加わるため計算し直す
+            dates |= set(self._search_dates(self.covered_end, end))
+            self.covered_end = end
+        return dates
+
+    def refresh(self):
+        """検索期間のイベントをすべて取得し、全日程の空き時間を計算し直す"""
+        with self._lock:
+            now_jst = get_now_jst()
+            if self.horizon is None:
+                self.horizon = self.end_date - max(self.start_date, now_jst)
+            start, end = self._current_range(now_jst)
+            events, sync_token = self._list_all_events(
+                timeMin=to_utc_str(start),
+                timeMax=to_utc_str(end),
+            )
+            self.events = {
+                event["id"]: event for event in events if event.get("status") != "cancelled"
             }
-            for slot in slots
-        ],
-        'total_hours': sum(slot['duration'] for slot in slots)
-    })
+            self.sync_token = sync_token
+            self.covered_end = end
+            self._today = start.date()
+            self.day_slots = {}
+            self._recompute_days(self._search_dates(start, end), now_jst)
 
-def format_output_text(slots, min_duration, include_holidays, show_total_hours, weekday_lang):
-    """空き時間リストをテキスト形式でフォーマットする
-    
-    Args:
-        slots: 空き時間リスト
-        min_duration: 最小時間（時間単位）
-        include_holidays: 祝日を含めるかどうか
+    def apply_changes(self):
+        """前回の同期以降に変更されたイベントを取得し、影響する日だけ再計算する
+
+        同期トークンが無効になっている場合（410 Gone）は全体を計算し直す。
+        あわせて検索期間を現在時刻に合わせて進め、今日の空き時間を計算し直す。
+
+        Returns:
+            再計算した日付のソート済みリスト
+        """
+        with self._lock:
+            if self.sync_token is None:
+                self.refresh()
+                return sorted(self.day_slots)
+
+            try:
+                changed_events, sync_token = self._list_all_events(syncToken=self.sync_token)
+            except HttpError as error:
+                if error.resp.status != 410:
+                    raise
+                self.refresh()
+                return sorted(self.day_slots)
+
+            affected_dates = set()
+            for event in changed_events:
+                previous = self.events.pop(event["id"], None)
+                if previous is not None:
+                    affected_dates |= get_event_dates(previous)
+                if event.get("status") != "cancelled":
+                    self.events[event["id"]] = event
+                    affected_dates |= get_event_dates(event)
+
+            self.sync_token = sync_token
+            now_jst = get_now_jst()
+            dates = self._advance(now_jst)
+            dates |= set(self._search_dates(*self._current_range(now_jst))) & affected_dates
+            dates = sorted(dates)
+            self._recompute_days(dates, now_jst)
+            return dates
+
+    def slots(self):
+        """現在時刻時点の空き時間を日付順に取得する
+
+        今日の空き時間は現在時刻で計算し直し、検索期間が進んだ分は新しく計算する。
+
+        Returns:
+            利用可能な時間枠のリスト（各要素はstart, end, durationを含む辞書）
+        """
+        with self._lock:
+            if self.covered_end is None:
+                return []
+
+            now_jst = get_now_jst()
+            self._recompute_days(self._advance(now_jst), now_jst)
+            return [
+                slot
+                for day in sorted(self.day_slots)
+                for slot in self.day_slots[day]
+            ]
+
+
+def watch_events(service, address, channel_id=None, token=None,
+                 ttl=WATCH_CHANNEL_TTL_SECONDS):
+    """プライマリカレンダーの変更通知チャンネルを作成する
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        address: 通知を受け取るWebhookのURL（HTTPS）
+        channel_id: チャンネルID（省略時はUUIDを生成）
+        token: 通知に付与される検証用トークン
+        ttl: チャンネルの有効期間（秒）
+
+    Returns:
+        チャンネル情報（id, resourceId, expirationなどを含む辞書）
+    """
+    body = {
+        "id": channel_id or str(uuid.uuid4()),
+        "type": "web_hook",
+        "address": address,
+        "params": {"ttl": str(ttl)},
+    }
+    if token:
+        body["token"] = token
+
+    # チャンネルを作成するPOSTのため、作成済みのチャンネルIDで再送しないようリトライしない
+    request = service.events().watch(calendarId=PRIMARY_CALENDAR_ID, body=body)
+    return execute_request(request, retry=False)
+
+def stop_watch(service, channel):
+    """変更通知チャンネルを停止する
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        channel: watch_events()が返したチャンネル情報
+    """
+    request = service.channels().stop(
+        body={"id": channel["id"], "resourceId": channel["resourceId"]}
+    )
+    execute_request(request, retry=False)
+
+def get_channel_renewal_delay(channel, now=None):
+    """通知チャンネルを作り直すまでの待機時間を取得する
+
+    Args:
+        channel: watch_events()が返したチャンネル情報
+        now: 現在時刻（UNIX時間の秒、省略時は取得する）
+
+    Returns:
+        有効期限のWATCH_RENEW_MARGIN_SECONDS秒前までの待機時間（秒）
+    """
+    now = time.time() if now is None else now
+    expiration = channel.get("expiration")
+    if expiration is None:
+        expires_at = now + WATCH_CHANNEL_TTL_SECONDS
+    else:
+        # expirationはUNIX時間のミリ秒
+        expires_at = int(expiration) / 1000.0
+    return max(0.0, expires_at - WATCH_RENEW_MARGIN_SECONDS - now)
+
+
+class NotificationHandler(BaseHTTPRequestHandler):
+    """Google Calendarのプッシュ通知を受け取るリクエストハンドラ"""
+
+    def do_POST(self):
+        """通知を検証し、変更があればキャッシュの更新を依頼する
+
+        Googleは応答が遅い通知を再送するため、キャッシュの更新を待たずに応答する。
+        """
+        # 本文は使用しないが、接続を再利用できるよう読み捨てる
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        channel_id = self.headers.get("X-Goog-Channel-ID")
+        token = self.headers.get("X-Goog-Channel-Token")
+        if not self.server.is_valid_channel(channel_id, token):
+            self.send_response(403)
+            self.end_headers()
+            return
+
+        self.server.handle_notification(self.headers.get("X-Goog-Resource-State"))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        """アクセスログを出力しない"""
+
+
+class NotificationServer(ThreadingHTTPServer):
+    """プッシュ通知を受け取り、AvailabilityCacheを差分更新するWebhook受信サーバー"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, cache, channel_id, token=None, on_update=None):
+        """
+        Args:
+            server_address: 待ち受けアドレス（(host, port)のタプル）
+            cache: 更新対象のAvailabilityCache
+            channel_id: 受け付けるチャンネルID
+            token: 受け付ける検証用トークン（Noneの場合は検証しない）
+            on_update: 再計算後に再計算した日付リストを引数に呼ばれる関数
+        """
+        super().__init__(server_address, NotificationHandler)
+        self.cache = cache
+        self.channel_id = channel_id
+        self.token = token
+        self.on_update = on_update
+        # サービスオブジェクトはスレッドセーフではないため、通知処理とAPI呼び出しを直列化する
+        self.lock = threading.Lock()
+        # 更新中に届いた通知はまとめて1回の更新で反映する
+        self._changed = threading.Event()
+        self._closed = False
+        self._worker = threading.Thread(target=self._process_changes, daemon=True)
+        self._worker.start()
+
+    def is_valid_channel(self, channel_id, token):
+        """通知が登録したチャンネルからのものか検証する"""
+        if channel_id != self.channel_id:
+            return False
+        return self.token is None or token == self.token
+
+    def handle_notification(self, resource_state):
+        """通知の種類に応じてキャッシュの更新を依頼する
+
+        更新はバックグラウンドのスレッドで行う。
+
+        Args:
+            resource_state: X-Goog-Resource-Stateヘッダーの値
+
+        Returns:
+            更新を依頼した場合はTrue
+        """
+        # チャンネル作成直後の"sync"通知は変更を含まない
+        if resource_state not in ("exists", "not_exists"):
+            return False
+
+        self._changed.set()
+        return True
+
+    def update(self):
+        """キャッシュを差分更新する
+
+        Returns:
+            再計算した日付のリスト（更新に失敗した場合は空リスト）
+        """
+        with self.lock:
+            try:
+                dates = self.cache.apply_changes()
+            except (HttpError, OSError) as error:
+                print(f"空き時間の更新に失敗しました: {error}", file=sys.stderr)
+                return []
+            if self.on_update:
+                self.on_update(dates)
+        return dates
+
+    def _process_changes(self):
+        """通知を待ち、キャッシュの更新を繰り返す"""
+        while True:
+            self._changed.wait()
+            if self._closed:
+                return
+            self._changed.clear()
+            self.update()
+
+    def server_close(self):
+        """待ち受けを終了し、更新用のスレッドを止める"""
+        self._closed = True
+        self._changed.set()
+        super().server_close()
+
+
+def renew_watch_channel(service, server, channel, address, token=None):
+    """通知チャンネルを作り直し、受信サーバーを新しいチャンネルに切り替える
+
+    古いチャンネルの停止に失敗しても、新しいチャンネルで通知を受け取り続ける。
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        server: NotificationServer
+        channel: 現在のチャンネル情報
+        address: 通知を受け取るHTTPSのURL
+        token: 通知に付与される検証用トークン
+
+    Returns:
+        新しいチャンネル情報（作り直しに失敗した場合はNone）
+    """
+    with server.lock:
+        try:
+            new_channel = watch_events(service, address, token=token)
+        except (HttpError, OSError) as error:
+            print(f"通知チャンネルの作り直しに失敗しました: {error}", file=sys.stderr)
+            return None
+
+        server.channel_id = new_channel["id"]
+        try:
+            stop_watch(service, channel)
+        except (HttpError, OSError) as error:
+            print(f"古い通知チャンネルの停止に失敗しました: {error}", file=sys.stderr)
+    return new_channel
+
+
+def run_watch_mode(service, args, start_date, end_date):
+    """変更通知を受け取りながら空き時間を出力し続ける
+
+    通知チャンネルは有効期限が切れる前に作り直す。
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        args: 引数オブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+    """
+    cache = AvailabilityCache(
+        service,
+        start_date,
+        end_date,
+        include_holidays=args.include_holidays,
+        min_hours=args.available_slots
+    )
+
+    def print_slots(dates=None):
+        print(format_output(
+            cache.slots(),
+            format=args.format,
+            min_duration=args.available_slots,
+            include_holidays=args.include_holidays,
+            show_total_hours=args.show_total_hours,
+            weekday_lang=args.weekday_lang
+        ))
+        sys.stdout.flush()
+
+    cache.refresh()
+    print_slots()
+
+    token = uuid.uuid4().hex
+    channel = watch_events(service, args.watch, token=token)
+    server = NotificationServer(
+        (WATCH_LISTEN_HOST, args.listen_port),
+        cache,
+        channel["id"],
+        token=token,
+        on_update=print_slots
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        while True:
+            time.sleep(get_channel_renewal_delay(channel))
+
+            new_channel = renew_watch_channel(service, server, channel, args.watch, token=token)
+            if new_channel is None:
+                time.sleep(WATCH_RENEW_RETRY_SECONDS)
+            else:
+                channel = new_channel
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        # 停止に失敗しても、終了の原因となった例外を隠さない
+        try:
+            stop_watch(service, channel)
+        except (HttpError, OSError) as error:
+            print(f"通知チャンネルの停止に失敗しました: {error}", file=sys.stderr)
+
+
+class CalendarWindow:
+    """検索期間の予定と祝日を取得・解析したデータ"""
+
+    def __init__(self, start_date, end_date, busy_periods, holidays):
+        """
+        Args:
+            start_date: 検索開始日時（JSTタイムゾーン）
+            end_date: 検索終了日時（JSTタイムゾーン）
+            busy_periods: 予定時間リスト（JSTタイムゾーン）
+            holidays: 祝日の日付（dateオブジェクト）のset
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.busy_periods = busy_periods
+        self.holidays = holidays
+
+
+def fetch_calendar_window(service, start_date, end_date):
+    """検索期間の予定と祝日を取得して解析する
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+
+    Returns:
+        CalendarWindowオブジェクト
+    """
+    start_date_jst = to_jst(start_date)
+    end_date_jst = to_jst(end_date)
+    events = get_calendar_events(service, start_date_jst, end_date_jst)
+    return CalendarWindow(
+        start_date_jst,
+        end_date_jst,
+        parse_busy_periods(events),
+        get_holiday_dates(service, start_date_jst, end_date_jst),
+    )
+
+def find_slots_in_window(window, include_holidays=False, min_hours=DEFAULT_MIN_HOURS,
+                         now_jst=None):
+    """取得済みの検索期間データから空き時間を検索する
+
+    find_available_slots()と同じ結果になるよう、現在時刻より前に終わった予定は除外する。
+
+    Args:
+        window: CalendarWindowオブジェクト
+        include_holidays: 祝日を含めるかどうか
+        min_hours: 最小空き時間（時間単位）
+        now_jst: 現在時刻（JSTタイムゾーン、省略時は取得する）
+
+    Returns:
+        利用可能な時間枠のリスト（各要素はstart, end, durationを含む辞書）
+    """
+    if now_jst is None:
+        now_jst = get_now_jst()
+    start_date_jst = max(window.start_date, now_jst)
+
+    # APIのtimeMinと同様に、検索開始時刻より後に終わる予定のみ対象とする
+    busy_periods_by_date = group_busy_periods_by_date(
+        (start, end) for start, end in window.busy_periods if end > start_date_jst
+    )
+
+    current_date = start_date_jst.replace(hour=0, minute=0, second=0, microsecond=0)
+    available_slots = []
+    while current_date <= window.end_date:
+        if current_date.weekday() < 5 and (
+            include_holidays or current_date.date() not in window.holidays
+        ):
+            available_slots.extend(find_day_slots(
+                current_date,
+                busy_periods_by_date.get(current_date.date(), []),
+                now_jst,
+                min_hours
+            ))
+        current_date += datetime.timedelta(days=1)
+
+    return available_slots
+
+
+class WindowPrefetcher:
+    """ページ送りされる検索期間を先読みする
+
+    検索期間の空き時間を返した後、次の期間の予定と祝日をバックグラウンドで取得して
+    上限付きのキャッシュに保持する。次の期間以外が要求された場合は、未実行の先読みを取り消す。
+    サービスオブジェクトはスレッドセーフではないため、取得はすべて1つのワーカースレッドで行う。
+    """
+
+    def __init__(self, service, max_windows=PREFETCH_CACHE_SIZE):
+        """
+        Args:
+            service: Google Calendar API サービスオブジェクト
+            max_windows: キャッシュする検索期間の最大数
+        """
+        self.service = service
+        self.max_windows = max_windows
+        self._executor = futures.ThreadPoolExecutor(max_workers=1)
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "prefetched": 0, "cancelled": 0}
+
+    def get_metrics(self):
+        """キャッシュヒット数・先読み数などのスナップショットを取得する"""
+        with self._lock:
+            return dict(self._metrics)
+
+    def _submit(self, key):
+        """検索期間の取得をワーカースレッドに登録する（ロック取得済みで呼び出す）"""
+        future = self._executor.submit(fetch_calendar_window, self.service, *key)
+        self._windows[key] = future
+
+        # 上限を超えたら古いものから破棄する
+        while len(self._windows) > self.max_windows:
+            _, evicted = self._windows.popitem(last=False)
+            evicted.cancel()
+        return future
+
+    def cancel_pending(self, keep=None):
+        """未実行の先読みを取り消す
+
+        Args:
+            keep: 取り消さない検索期間のキー
+        """
+        with self._lock:
+            for key, future in list(self._windows.items()):
+                if key != keep and future.cancel():
+                    del self._windows[key]
+                    self._metrics["cancelled"] += 1
+
+    def prefetch(self, start_date, end_date):
+        """検索期間をバックグラウンドで先読みする
+
+        Args:
+            start_date: 検索開始日時（datetimeオブジェクト）
+            end_date: 検索終了日時（datetimeオブジェクト）
+
+        Returns:
+            取得結果のFutureオブジェクト
+        """
+        key = (to_jst(start_date), to_jst(end_date))
+        with self._lock:
+            future = self._windows.get(key)
+            if future is None:
+                future = self._submit(key)
+                self._metrics["prefetched"] += 1
+            return future
+
+    def get_window(self, start_date, end_date):
+        """検索期間のデータを取得する（先読み済みであればキャッシュから返す）
+
+        Args:
+            start_date: 検索開始日時（datetimeオブジェクト）
+            end_date: 検索終了日時（datetimeオブジェクト）
+
+        Returns:
+            CalendarWindowオブジェクト
+        """
+        key = (to_jst(start_date), to_jst(end_date))
+        with self._lock:
+            future = self._windows.get(key)
+            if future is not None:
+                self._windows.move_to_end(key)
+                self._metrics["hits"] += 1
+
+        if future is None:
+            # 想定外の期間が要求された場合は、不要になった先読みを取り消す
+            self.cancel_pending()
+            with self._lock:
+                self._metrics["misses"] += 1
+                future = self._submit(key)
+
+        try:
+            return future.result()
+        except BaseException:
+            # 失敗した結果はキャッシュしない
+            with self._lock:
+                if self._windows.get(key) is future:
+                    del self._windows[key]
+            raise
+
+    def find_available_slots(self, start_date, end_date, include_holidays=False,
+                             min_hours=DEFAULT_MIN_HOURS):
+        """空き時間を検索し、同じ長さの次の期間を先読みする
+
+        Args:
+            start_date: 検索開始日時（datetimeオブジェクト）
+            end_date: 検索終了日時（datetimeオブジェクト）
+            include_holidays: 祝日を含めるかどうか
+            min_hours: 最小空き時間（時間単位）
+
+        Returns:
+            利用可能な時間枠のリスト（各要素はstart, end, durationを含む辞書）
+        """
+        window = self.get_window(start_date, end_date)
+        self.prefetch(end_date, end_date + (end_date - start_date))
+        return find_slots_in_window(window, include_holidays, min_hours)
+
+    def close(self):
+        """未実行の先読みを取り消し、ワーカースレッドを終了する"""
+        self.cancel_pending()
+        self._executor.shutdown(wait=False)
+
+
+def run_interactive_mode(service, args, start_date):
+    """期間をページ送りしながら空き時間を表示する
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        args: 引数オブジェクト
+        start_date: 最初の検索開始日時（datetimeオブジェクト）
+    """
+    prefetcher = WindowPrefetcher(service)
+    page = datetime.timedelta(days=INTERACTIVE_PAGE_DAYS)
+    try:
+        while True:
+            end_date = start_date + page
+            slots = prefetcher.find_available_slots(
+                start_date,
+                end_date,
+                include_holidays=args.include_holidays,
+                min_hours=args.available_slots
+            )
+            print(format_output(
+                slots,
+                format=args.format,
+                min_duration=args.available_slots,
+                include_holidays=args.include_holidays,
+                show_total_hours=args.show_total_hours,
+                weekday_lang=args.weekday_lang,
+                start_date=start_date,
+                end_date=end_date
+            ))
+
+            try:
+                answer = input(f"\n[Enter] next {INTERACTIVE_PAGE_DAYS} days / [q] quit: ")
+            except EOFError:
+                break
+            if answer.strip().lower() == "q":
+                break
+            start_date += page
+    finally:
+        prefetcher.close()
+
+
+class AsyncHttpTransport:
+    """aiohttpの接続プールを使用するHTTPトランスポート
+
+    接続先ごとにKeep-Alive接続をプールして再利用し、同時に使用する接続数を制限する。
+    """
+
+    def __init__(self, max_connections=ASYNC_MAX_CONNECTIONS, timeout=ASYNC_REQUEST_TIMEOUT,
+                 ssl_context=None):
+        """
+        Args:
+            max_connections: 同時に使用する最大接続数
+            timeout: 1リクエストあたりのタイムアウト（秒）
+            ssl_context: HTTPS接続に使用するSSLコンテキスト（省略時はデフォルト）
+        """
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        # セマフォとセッションは作成したイベントループでしか使えないため、ループごとに持つ
+        self._semaphores = {}
+        self._sessions = {}
+
+    def _get_semaphore(self):
+        """同時実行数を制限するセマフォを取得する（イベントループごとに作成する）"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_connections)
+        return semaphore
+
+    def _get_session(self):
+        """接続プールを持つセッションを取得する（イベントループごとに作成する）"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector_options = {"limit": self.max_connections}
+            if self.ssl_context is not None:
+                connector_options["ssl"] = self.ssl_context
+            session = self._sessions[loop] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**connector_options),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return session
+
+    async def request(self, method, url, headers=None, body=None):
+        """HTTPリクエストを送信する
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL
+            headers: リクエストヘッダーの辞書
+            body: リクエスト本文（bytes）
+
+        Returns:
+            (status, headers, body)のタプル。headersのキーは小文字
+        """
+        async with self._get_semaphore():
+            try:
+                async with self._get_session().request(
+                    method, url, headers=headers, data=body
+                ) as response:
+                    content = await response.read()
+                    response_headers = {
+                        name.lower(): value for name, value in response.headers.items()
+                    }
+                    return response.status, response_headers, content
+            except aiohttp.ClientConnectionError as error:
+                # リトライの判定で通信エラーとして扱えるよう標準の例外に変換する
+                raise ConnectionError(str(error)) from error
+
+    async def close(self):
+        """現在のイベントループでプールしている接続をすべて閉じる"""
+        loop = asyncio.get_running_loop()
+        self._semaphores.pop(loop, None)
+        session = self._sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+
+class AsyncCalendarClient:
+    """Google Calendar APIのasyncioクライアント
+
+    リクエストは共有のリクエストスケジューラ経由で送信し、レート制限・リトライ・
+    同一リクエストの合流は同期版と同じ扱いになる。
+    """
+
+    def __init__(self, credentials=None, transport=None, scheduler=None,
+                 base_url=CALENDAR_API_BASE_URL):
+        """
+        Args:
+            credentials: 認証情報（Noneの場合はAuthorizationヘッダーを付与しない）
+            transport: AsyncHttpTransport（省略時は新しく作成する）
+            scheduler: RequestScheduler（省略時は共有のスケジューラ）
+            base_url: Calendar APIのベースURL
+        """
+        self.credentials = credentials
+        self.transport = transport or AsyncHttpTransport()
+        self.scheduler = scheduler or get_request_scheduler()
+        self.base_url = base_url.rstrip("/")
+        # ロックは作成したイベントループでしか使えないため、ループごとに持つ
+        self._refresh_locks = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _needs_refresh(self):
+        """アクセストークンの更新が必要かどうかを判定する"""
+        return not self.credentials.access_token or self.credentials.access_token_expired
+
+    async def _authorization_headers(self):
+        """アクセストークンを取得する（期限切れの場合は更新する）"""
+        if self.credentials is None:
+            return {}
+
+        if self._needs_refresh():
+            loop = asyncio.get_running_loop()
+            refresh_lock = self._refresh_locks.get(loop)
+            if refresh_lock is None:
+                refresh_lock = self._refresh_locks[loop] = asyncio.Lock()
+            # 並行するリクエストが同時にトークンを更新しないよう、1つだけが更新する
+            async with refresh_lock:
+                if self._needs_refresh():
+                    # トークン更新はブロッキング処理のためスレッドで実行する
+                    await loop.run_in_executor(None, self.credentials.refresh, httplib2.Http())
+        return {"Authorization": "Bearer " + self.credentials.access_token}
+
+    async def request_json(self, method, path, params=None, body=None):
+        """APIを呼び出してJSONレスポンスを取得する
+
+        Args:
+            method: HTTPメソッド
+            path: ベースURLからのパス
+            params: クエリパラメータの辞書
+            body: リクエスト本文（JSONに変換する）
+
+        Returns:
+            レスポンスのJSON（辞書）
+        """
+        url = self.base_url + path
+        if params:
+            url += "?" + urlencode(params)
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+
+        async def send():
+            headers = await self._authorization_headers()
+            headers["Accept"] = "application/json"
+            if payload is not None:
+                headers["Content-Type"] = "application/json"
+
+            status, response_headers, content = await self.transport.request(
+                method, url, headers, payload
+            )
+            if status >= 300:
+                resp = httplib2.Response(dict(response_headers, status=status))
+                raise HttpError(resp, content, uri=url)
+            return json.loads(content.decode("utf-8"))
+
+        return await self.scheduler.execute_async(send, key=(method, url, payload))
+
+    async def close(self):
+        """接続を閉じる"""
+        self._refresh_locks.pop(asyncio.get_running_loop(), None)
+        await self.transport.close()
+
+
+def get_async_calendar_client(args=None):
+    """認証済みのasyncio用Calendar APIクライアントを取得する
+
+    Args:
+        args: 引数オブジェクト（OAuth2フローに使用）
+
+    Returns:
+        AsyncCalendarClientオブジェクト
+    """
+    return AsyncCalendarClient(credentials=get_credentials(args))
+
+async def list_events_async(client, calendar_id, **params):
+    """events.listをページングしながら全件取得する
+
+    Args:
+        client: AsyncCalendarClientオブジェクト
+        calendar_id: カレンダーID
+        **params: クエリパラメータ
+
+    Returns:
+        イベントリスト
+    """
+    path = "/calendars/" + quote(calendar_id, safe="") + "/events"
+    events = []
+    while True:
+        events_result = await client.request_json("GET", path, params)
+        events.extend(events_result.get("items", []))
+
+        page_token = events_result.get("nextPageToken")
+        if not page_token:
+            return events
+        params["pageToken"] = page_token
+
+async def get_calendar_events_async(client, start_date, end_date):
+    """指定期間のカレンダーイベントを取得する（asyncio版）
+
+    Args:
+        client: AsyncCalendarClientオブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+
+    Returns:
+        イベントリスト
+    """
+    return await list_events_async(
+        client,
+        PRIMARY_CALENDAR_ID,
+        timeMin=to_utc_str(start_date),
+        timeMax=to_utc_str(end_date),
+        singleEvents="true",
+        orderBy="startTime",
+    )
+
+async def get_holiday_dates_async(client, start_date, end_date):
+    """指定期間内の祝日の日付を取得する（asyncio版）
+
+    Args:
+        client: AsyncCalendarClientオブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+
+    Returns:
+        祝日の日付（dateオブジェクト）のset
+    """
+    events = await list_events_async(
+        client,
+        HOLIDAY_CALENDAR_ID,
+        timeMin=to_utc_str(start_date),
+        timeMax=to_utc_str(end_date),
+        singleEvents="true",
+    )
+    return parse_holiday_dates(events)
+
+async def get_free_busy_async(client, start_date, end_date, calendar_ids=(PRIMARY_CALENDAR_ID,)):
+    """指定期間の予定あり時間帯をfreeBusy APIで取得する（asyncio版）
+
+    Args:
+        client: AsyncCalendarClientオブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+        calendar_ids: 対象のカレンダーIDのリスト
+
+    Returns:
+        (start, end)形式のタプルリスト（JSTタイムゾーン、開始時刻順）
+    """
+    result = await client.request_json("POST", "/freeBusy", body={
+        "timeMin": to_utc_str(start_date),
+        "timeMax": to_utc_str(end_date),
+        "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+    })
+
+    busy_periods = []
+    calendars = result.get("calendars", {})
+    for calendar_id in calendar_ids:
+        for period in calendars.get(calendar_id, {}).get("busy", []):
+            busy_periods.append((
+                to_jst(parse_datetime(period["start"])),
+                to_jst(parse_datetime(period["end"])),
+            ))
+    return sorted(busy_periods)
+
+async def find_available_slots_async(client, start_date, end_date, include_holidays=False,
+                                     min_hours=DEFAULT_MIN_HOURS):
+    """営業時間内で指定した最小時間以上の空き時間を検索する（asyncio版）
+
+    予定と祝日を並行して取得し、find_available_slots()と同じ結果を返す。
+
+    Args:
+        client: AsyncCalendarClientオブジェクト
+        start_date: 検索開始日時（datetimeオブジェクト）
+        end_date: 検索終了日時（datetimeオブジェクト）
+        include_holidays: 祝日を含めるかどうか（デフォルト: False）
+        min_hours: 最小空き時間（時間単位、デフォルト: 1時間）
+
+    Returns:
+        利用可能な時間枠のリスト（各要素はstart, end, durationを含む辞書）
+    """
+    now_jst = get_now_jst()
+    start_date_jst = max(to_jst(start_date), now_jst)
+    end_date_jst = to_jst(end_date)
+
+    if include_holidays:
+        events = await get_calendar_events_async(client, start_date_jst, end_date_jst)
+        holidays = set()
+    else:
+        events, holidays = await asyncio.gather(
+            get_calendar_events_async(client, start_date_jst, end_date_jst),
+            get_holiday_dates_async(client, start_date_jst, end_date_jst),
+        )
+
+    window = CalendarWindow(start_date_jst, end_date_jst, parse_busy_periods(events), holidays)
+    return find_slots_in_window(window, include_holidays, min_hours, now_jst=now_jst)
+
+
+def percentile(sorted_values, p):
+    """ソート済みの値リストのパーセンタイルを線形補間で計算する
+
+    Args:
+        sorted_values: 昇順にソートされた数値リスト
+        p: パーセンタイル（0-100）
+
+    Returns:
+        パーセンタイル値（値がない場合は0.0）
+    """
+    if not sorted_values:
+        return 0.0
+
+    rank = (len(sorted_values) - 1) * p / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+def calculate_trend_slope(values):
+    """等間隔の系列に最小二乗法で直線を当てはめた傾きを計算する
+
+    Args:
+        values: 数値リスト
+
+    Returns:
+        1要素あたりの変化量（要素が2未満の場合は0.0）
+    """
+    n = len(values)
+    if n < 2:
+        return 0.0
+
+    mean_x = (n - 1) / 2.0
+    mean_y = sum(values) / float(n)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    variance = sum((x - mean_x) ** 2 for x in range(n))
+    return covariance / variance
+
+
+class UtilizationAnalyzer:
+    """過去のイベントから稼働状況を集計する
+
+    開始時刻順に渡された予定時間を重なりを除いて結合し、1時間単位の区間に
+    分割して集計する。計算量は予定の数に比例し、分単位のサンプリングは行わない。
+    """
+
+    def __init__(self, start_date, end_date, holidays=(), include_holidays=False):
+        """
+        Args:
+            start_date: 分析開始日時（datetimeオブジェクト）
+            end_date: 分析終了日時（datetimeオブジェクト）
+            holidays: 祝日の日付（dateオブジェクト）の集合
+            include_holidays: 祝日を営業日として扱うかどうか
+        """
+        self.start_date = to_jst(start_date)
+        self.end_date = to_jst(end_date)
+        self.holidays = set(holidays)
+        self.include_holidays = include_holidays
+        self.event_count = 0
+        # 曜日×時間帯ごとの予定時間（秒）
+        self.heatmap_seconds = [[0.0] * 24 for _ in range(7)]
+        # 日付ごとの営業時間内の予定時間（秒）
+        self.business_busy_seconds = {}
+        self._current = None
+
+    def add_events(self, events):
+        """イベントを集計に追加する
+
+        Args:
+            events: 開始時刻順のGoogle Calendarイベント（イテレータ可）
+        """
+        for start, end in parse_busy_periods(events):
+            self.add_busy_period(start, end)
+
+    def add_busy_period(self, start, end):
+        """予定時間を集計に追加する（開始時刻順に呼び出す）
+
+        Args:
+            start: 開始時刻（JSTタイムゾーン）
+            end: 終了時刻（JSTタイムゾーン）
+        """
+        start = max(start, self.start_date)
+        end = min(end, self.end_date)
+        if end <= start:
+            return
+
+        self.event_count += 1
+        if self._current is None:
+            self._current = [start, end]
+        elif start <= self._current[1]:
+            # 重なる予定は結合する
+            self._current[1] = max(self._current[1], end)
+        else:
+            self._accumulate(*self._current)
+            self._current = [start, end]
+
+    def _accumulate(self, start, end):
+        """結合済みの予定時間を1時間単位に分割して集計する"""
+        cursor = start
+        while cursor < end:
+            hour_end = cursor.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+            segment_end = min(end, hour_end)
+            seconds = (segment_end - cursor).total_seconds()
+
+            self.heatmap_seconds[cursor.weekday()][cursor.hour] += seconds
+            if BUSINESS_HOURS_START <= cursor.hour < BUSINESS_HOURS_END:
+                day = cursor.date()
+                self.business_busy_seconds[day] = self.business_busy_seconds.get(day, 0.0) + seconds
+
+            cursor = segment_end
+
+    def _is_business_day(self, day):
+        """営業日（平日かつ祝日以外）かどうかを判定する"""
+        if day.weekday() >= 5:
+            return False
+        return self.include_holidays or day not in self.holidays
+
+    def summary(self):
+        """集計結果を取得する
+
+        Returns:
+            曜日・時間帯別の予定率、営業日ごとの会議負荷のパーセンタイル、
+            月ごとの空き時間と、営業日1日あたりの空き時間の週ごとの傾きを含む辞書
+        """
+        if self._current is not None:
+            self._accumulate(*self._current)
+            self._current = None
+
+        jst = get_jst_timezone()
+        weekday_counts = [0] * 7
+        daily_busy_hours = []
+        # 週ごとの[空き時間の合計, 営業日数]
+        weekly_free_hours = {}
+        monthly = {}
+
+        day = self.start_date.date()
+        while day < self.end_date.date():
+            weekday_counts[day.weekday()] += 1
+
+            if self._is_business_day(day):
+                day_start, day_end, _, _ = get_business_hours(
+                    jst.localize(datetime.datetime.combine(day, datetime.time()))
+                )
+                busy_hours = self.business_busy_seconds.get(day, 0.0) / 3600
+                free_hours = calculate_duration_hours(day_start, day_end) - busy_hours
+                daily_busy_hours.append(busy_hours)
+
+                week = day.isocalendar()[:2]
+                weekly = weekly_free_hours.setdefault(week, [0.0, 0])
+                weekly[0] += free_hours
+                weekly[1] += 1
+
+                month = monthly.setdefault(day.strftime("%Y-%m"), {
+                    "business_days": 0, "busy_hours": 0.0, "free_hours": 0.0,
+                })
+                month["business_days"] += 1
+                month["busy_hours"] += busy_hours
+                month["free_hours"] += free_hours
+
+            day += datetime.timedelta(days=1)
+
+        daily_busy_hours.sort()
+        meeting_load = {
+            f"p{p}": percentile(daily_busy_hours, p) for p in ANALYTICS_PERCENTILES
+        }
+        meeting_load["mean"] = (
+            sum(daily_busy_hours) / len(daily_busy_hours) if daily_busy_hours else 0.0
+        )
+        meeting_load["max"] = daily_busy_hours[-1] if daily_busy_hours else 0.0
+
+        return {
+            "start": self.start_date.isoformat(),
+            "end": self.end_date.isoformat(),
+            "events": self.event_count,
+            "business_days": len(daily_busy_hours),
+            # 各曜日・時間帯のうち予定が入っていた割合（0.0-1.0）
+            "heatmap": {
+                WEEKDAY_NAMES[weekday]: [
+                    seconds / (weekday_counts[weekday] * 3600) if weekday_counts[weekday] else 0.0
+                    for seconds in self.heatmap_seconds[weekday]
+                ]
+                for weekday in range(7)
+            },
+            "meeting_load": meeting_load,
+            "free_time_trend": {
+                "monthly": [
+                    dict(month=key, **monthly[key]) for key in sorted(monthly)
+                ],
+                # 期間の端の週や祝日のある週で営業日数が変わっても傾かないよう、
+                # 週ごとの営業日1日あたりの空き時間に当てはめる
+                "slope_hours_per_day": calculate_trend_slope([
+                    free_hours / business_days
+                    for free_hours, business_days in (
+                        weekly_free_hours[week] for week in sorted(weekly_free_hours)
+                    )
+                ]),
+            },
+        }
+
+
+def analyze_utilization(service, days=ANALYTICS_DEFAULT_DAYS, include_holidays=False):
+    """過去N日間（今日を含まない）の稼働状況を集計する
+
+    Args:
+        service: Google Calendar API サービスオブジェクト
+        days: 分析する日数
+        include_holidays: 祝日を営業日として扱うかどうか
+
+    Returns:
+        UtilizationAnalyzer.summary()の集計結果
+    """
+    end_date, _ = get_day_start_end(get_now_jst())
+    start_date = end_date - datetime.timedelta(days=days)
+
+    holidays = set() if include_holidays else get_holiday_dates(service, start_date, end_date)
+    analyzer = UtilizationAnalyzer(start_date, end_date, holidays, include_holidays)
+    analyzer.add_events(iter_calendar_events(service, start_date, end_date))
+    return analyzer.summary()
+
+def format_analytics_text(summary):
+    """稼働状況の集計結果をテキスト形式でフォーマットする
+
+    Args:
+        summary: analyze_utilization()の集計結果
+
+    Returns:
+        テキスト形式の文字列
+    """
+    output = []
+    output.append(
+        f"Utilization analytics {summary['start'][:10]} - {summary['end'][:10]} "
+        f"({summary['events']} events, {summary['business_days']} business days)"
+    )
+
+    # 曜日×時間帯の予定率（営業時間のみ）
+    hours = range(BUSINESS_HOURS_START, BUSINESS_HOURS_END)
+    output.append("\nBusy-hour heatmap (% of time busy)")
+    output.append("     " + "".join(f"{f'{hour}:00':>6}" for hour in hours))
+    for weekday in WEEKDAY_NAMES:
+        output.append(f"{weekday:<5}" + "".join(
+            f"{summary['heatmap'][weekday][hour] * 100:>6.0f}" for hour in hours
+        ))
+
+    # 会議負荷
+    load = summary["meeting_load"]
+    output.append("\nMeeting load per business day (hours)")
+    output.append("  ".join(
+        f"{key} {load[key]:.2f}"
+        for key in [f"p{p}" for p in ANALYTICS_PERCENTILES] + ["mean", "max"]
+    ))
+
+    # 空き時間の推移
+    trend = summary["free_time_trend"]
+    output.append("\nFree time trend (hours)")
+    output.append(f"{'month':<9}{'days':>6}{'free':>8}{'free/day':>10}")
+    for month in trend["monthly"]:
+        free_per_day = month["free_hours"] / month["business_days"]
+        output.append(
+            f"{month['month']:<9}{month['business_days']:>6}"
+            f"{month['free_hours']:>8.1f}{free_per_day:>10.2f}"
+        )
+    output.append(f"Trend: {trend['slope_hours_per_day']:+.2f} free hours/day per week")
+
+    return "\n".join(output)
+
+def format_output_json(slots):
+    """空き時間リストをJSON形式でフォーマットする
+    
+    Args:
+        slots: 空き時間リスト
+        
+    Returns:
+        JSON形式の文字列
+    """
+    return json.dumps({
+        'slots': [
+            {
+                'start': slot['start'].isoformat(),
+                'end': slot['end'].isoformat(),
+                'duration': slot['duration']
+            }
+            for slot in slots
+        ],
+        'total_hours': sum(slot['duration'] for slot in slots)
+    })
+
+def format_output_text(slots, min_duration, include_holidays, show_total_hours, weekday_lang,
+                       start_date=None, end_date=None):
+    """空き時間リストをテキスト形式でフォーマットする
+    
+    Args:
+        slots: 空き時間リスト
+        min_duration: 最小時間（時間単位）
+        include_holidays: 祝日を含めるかどうか
         show_total_hours: 合計時間を表示するかどうか
         weekday_lang: 曜日の言語（'ja'または'en'）
+        start_date: 検索開始日時（省略時はヘッダーにデフォルトの検索期間を表示する）
+        end_date: 検索終了日時
         
     Returns:
         テキスト形式の文字列
@@ -452,10 +2388,13 @@ def format_output_text(slots, min_duration, include_holidays, show_total_hours,
     output = []
     
     # ヘッダー
+    if start_date is not None and end_date is not None:
+        period = f"from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
+    else:
+        period = f"for the next {DEFAULT_DAYS_AHEAD} days"
     output.append(
-        "Finding available time slots (weekdays, {0}:00-{1}:00) of {2}+ hours for the next {3} days".format(
-            BUSINESS_HOURS_START, BUSINESS_HOURS_END, min_duration, DEFAULT_DAYS_AHEAD
-        )
+        f"Finding available time slots (weekdays, {BUSINESS_HOURS_START}:00-{BUSINESS_HOURS_END}:00) "
+        f"of {min_duration}+ hours {period}"
     )
     
     # 祝日の扱いについて説明
@@ -483,7 +2422,8 @@ def format_output_text(slots, min_duration, include_holidays, show_total_hours,
     return '\n'.join(output)
 
 def format_output(slots, format='text', min_duration=DEFAULT_MIN_HOURS, 
-                 include_holidays=False, show_total_hours=False, weekday_lang='ja'):
+                 include_holidays=False, show_total_hours=False, weekday_lang='ja',
+                 start_date=None, end_date=None):
     """空き時間リストを指定された形式でフォーマットする
     
     Args:
@@ -493,6 +2433,8 @@ def format_output(slots, format='text', min_duration=DEFAULT_MIN_HOURS,
         include_holidays: 祝日を含めるかどうか
         show_total_hours: 合計時間を表示するかどうか
         weekday_lang: 曜日の言語（'ja'または'en'）
+        start_date: 検索開始日時（テキスト形式のヘッダーに表示する）
+        end_date: 検索終了日時（テキスト形式のヘッダーに表示する）
         
     Returns:
         フォーマットされた文字列
@@ -501,7 +2443,8 @@ def format_output(slots, format='text', min_duration=DEFAULT_MIN_HOURS,
         return format_output_json(slots)
     else:
         return format_output_text(
-            slots, min_duration, include_holidays, show_total_hours, weekday_lang
+            slots, min_duration, include_holidays, show_total_hours, weekday_lang,
+            start_date=start_date, end_date=end_date
         )
 
 def get_calendar_service(args=None):
@@ -531,30 +2474,51 @@ def main():
     # Google Calendar APIサービスを初期化
     service = get_calendar_service(args)
     
+    # 稼働状況の分析
+    if args.analytics is not None:
+        summary = analyze_utilization(service, args.analytics, args.include_holidays)
+        if args.format == 'json':
+            print(json.dumps(summary))
+        else:
+            print(format_analytics_text(summary))
+
     # 空き時間検索処理
-    if args.available_slots is not None:
+    elif args.available_slots is not None:
         # 検索期間（現在から2週間後まで）
         now = datetime.datetime.now(pytz.UTC)
         end_date = now + datetime.timedelta(days=DEFAULT_DAYS_AHEAD)
         
-        # 空き時間検索
-        slots = find_available_slots(
-            service, 
-            now, 
-            end_date, 
-            include_holidays=args.include_holidays, 
-            min_hours=args.available_slots
-        )
+        # 変更通知を受け取りながら差分更新する
+        if args.watch:
+            run_watch_mode(service, args, now, end_date)
         
-        # 結果を出力
-        print(format_output(
-            slots, 
-            format=args.format, 
-            min_duration=args.available_slots, 
-            include_holidays=args.include_holidays,
-            show_total_hours=args.show_total_hours,
-            weekday_lang=args.weekday_lang
-        ))
+        # ページ送りしながら表示する
+        elif args.interactive:
+            run_interactive_mode(service, args, now)
+        
+        else:
+            # 空き時間検索
+            slots = find_available_slots(
+                service, 
+                now, 
+                end_date, 
+                include_holidays=args.include_holidays, 
+                min_hours=args.available_slots
+            )
+            
+            # 結果を出力
+            print(format_output(
+                slots, 
+                format=args.format, 
+                min_duration=args.available_slots, 
+                include_holidays=args.include_holidays,
+                show_total_hours=args.show_total_hours,
+                weekday_lang=args.weekday_lang
+            ))
+
+    # APIリクエストのメトリクスを出力
+    if args.show_api_metrics:
+        print(json.dumps(get_request_scheduler().get_metrics()), file=sys.stderr)
 
 if __name__ == "__main__":
     main()
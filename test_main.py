@@ -3,7 +3,25 @@ from unittest.mock import patch, MagicMock
 import datetime
 import pytz
 import json
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from io import StringIO
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from dateutil import parser as date_parser
+
+from apiclient import discovery
+from apiclient.errors import HttpError
+from apiclient.http import HttpMockSequence
+
+import main as main_module
 
 from main import (
     find_available_slots, 
@@ -12,9 +30,43 @@ from main import (
     get_day_start_end,
     get_business_hours,
     format_output_json,
-    format_output_text
+    format_output_text,
+    TokenBucket,
+    RequestScheduler,
+    compute_backoff_delay,
+    is_retryable_error,
+    AvailabilityCache,
+    NotificationServer,
+    watch_events,
+    get_channel_renewal_delay,
+    renew_watch_channel,
+    WATCH_CHANNEL_TTL_SECONDS,
+    WATCH_RENEW_MARGIN_SECONDS,
+    UtilizationAnalyzer,
+    iter_calendar_events,
+    get_holiday_dates,
+    format_analytics_text,
+    percentile,
+    setup_arg_parser,
+    ANALYTICS_DEFAULT_DAYS,
+    parse_datetime,
+    HOLIDAY_CALENDAR_ID,
+    fetch_calendar_window,
+    find_slots_in_window,
+    WindowPrefetcher,
+    run_interactive_mode,
+    AsyncHttpTransport,
+    AsyncCalendarClient,
+    find_available_slots_async,
+    get_free_busy_async,
+    BUFFER_MINUTES,
+    BUSINESS_HOURS_START,
+    BUSINESS_HOURS_END,
 )
 
+PERF_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baseline.json")
+DIFFERENTIAL_CASES = 100
+
 
 class TestMySchedule(unittest.TestCase):
     def setUp(self):
@@ -230,5 +282,1395 @@ class TestMySchedule(unittest.TestCase):
             main_module.is_holiday = original_is_holiday
 
 
+def build_fake_service(responses):
+    """エラーを注入できるフェイクHTTPトランスポートでサービスを作成する"""
+    return discovery.build("calendar", "v3", http=HttpMockSequence(responses))
+
+
+class FakeCalendarService:
+    """期間指定に応じてイベントを返すフェイクのCalendar APIサービス
+
+    timeMin/timeMaxと重なるイベントだけを返し、APIの絞り込みを再現する。
+    syncTokenを指定した場合は、change()で反映した変更を返す。
+    """
+
+    def __init__(self, events=(), holidays=(), gate=None):
+        self.events_data = list(events)
+        self.holidays = list(holidays)
+        self.gate = gate
+        self.started = threading.Event()
+        self.calls = []
+        self.changes = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        request = MagicMock()
+        request.execute.side_effect = lambda: self._execute(params)
+        return request
+
+    def change(self, events):
+        """イベントの追加・変更・削除（status: cancelled）を反映する"""
+        for event in events:
+            self.events_data = [
+                current for current in self.events_data if current.get("id") != event["id"]
+            ]
+            if event.get("status") != "cancelled":
+                self.events_data.append(event)
+            self.changes.append(event)
+
+    def _execute(self, params):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+
+        if "syncToken" in params:
+            changes, self.changes = self.changes, []
+            return {"items": changes, "nextSyncToken": "sync"}
+
+        time_min = parse_datetime(params["timeMin"])
+        time_max = parse_datetime(params["timeMax"])
+        if params["calendarId"] == HOLIDAY_CALENDAR_ID:
+            jst = pytz.timezone("Asia/Tokyo")
+            items = [
+                {
+                    "start": {"date": day.isoformat()},
+                    "end": {"date": (day + datetime.timedelta(days=1)).isoformat()},
+                }
+                for day in self.holidays
+                if jst.localize(datetime.datetime.combine(day, datetime.time())) < time_max
+                and jst.localize(datetime.datetime.combine(
+                    day + datetime.timedelta(days=1), datetime.time()
+                )) > time_min
+            ]
+        else:
+            items = [
+                event for event in self.events_data
+                if self._parse_time(event["end"]) > time_min
+                and self._parse_time(event["start"]) < time_max
+            ]
+            if params.get("orderBy") == "startTime":
+                # 開始時刻が同じイベントは終了時刻順に返す
+                items.sort(key=lambda event: (
+                    self._parse_time(event["start"]), self._parse_time(event["end"])
+                ))
+        return {"items": items, "nextSyncToken": "sync"}
+
+    @staticmethod
+    def _parse_time(value):
+        """イベントの日時（終日イベントはJSTの0:00）を取得する"""
+        if "dateTime" in value:
+            return parse_datetime(value["dateTime"])
+        jst = pytz.timezone("Asia/Tokyo")
+        return jst.localize(datetime.datetime.combine(parse_datetime(value["date"]), datetime.time()))
+
+
+class FakeClock:
+    """sleepで時間が進むテスト用の時計"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make_scheduler(self, **kwargs):
+        kwargs.setdefault("clock", self.clock)
+        kwargs.setdefault("sleep", self.clock.sleep)
+        kwargs.setdefault("rand", lambda: 0.5)
+        return RequestScheduler(**kwargs)
+
+    def test_token_bucket(self):
+        """トークンバケットのレート制限のテスト"""
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=self.clock)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        # バースト上限を超えると補充を待つ
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+        # 時間が経過すると補充される（容量を超えない）
+        self.clock.now += 10
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+
+    def test_backoff_and_retryable_errors(self):
+        """バックオフ時間とリトライ対象エラー判定のテスト"""
+        self.assertEqual(compute_backoff_delay(0, 1.0, 32.0, rand=lambda: 1.0), 1.0)
+        self.assertEqual(compute_backoff_delay(3, 1.0, 32.0, rand=lambda: 1.0), 8.0)
+        self.assertEqual(compute_backoff_delay(10, 1.0, 32.0, rand=lambda: 1.0), 32.0)
+        self.assertEqual(compute_backoff_delay(3, 1.0, 32.0, rand=lambda: 0.0), 0.0)
+
+        def http_error(status, reason=None):
+            content = json.dumps({"error": {"errors": [{"reason": reason}]}}).encode()
+            return HttpError(MagicMock(status=status), content)
+
+        self.assertTrue(is_retryable_error(http_error(429)))
+        self.assertTrue(is_retryable_error(http_error(503)))
+        self.assertTrue(is_retryable_error(http_error(403, "rateLimitExceeded")))
+        self.assertTrue(is_retryable_error(http_error(403, "userRateLimitExceeded")))
+        self.assertFalse(is_retryable_error(http_error(403, "forbidden")))
+        self.assertFalse(is_retryable_error(http_error(404)))
+        self.assertTrue(is_retryable_error(ConnectionError()))
+        self.assertFalse(is_retryable_error(ValueError()))
+
+    def test_retry_on_rate_limit(self):
+        """403/429エラー時にリトライして成功するテスト"""
+        rate_limited = json.dumps({"error": {"errors": [{"reason": "rateLimitExceeded"}]}})
+        service = build_fake_service([
+            ({"status": "403"}, rate_limited),
+            ({"status": "429", "retry-after": "5"}, "{}"),
+            ({"status": "200"}, json.dumps({"items": [{"id": "a"}]})),
+        ])
+        scheduler = self.make_scheduler()
+
+        result = scheduler.execute(service.events().list(calendarId="primary"))
+
+        self.assertEqual(result["items"], [{"id": "a"}])
+        # 1回目: 1.0 * 2^0 * 0.5、2回目: Retry-Afterの5秒
+        self.assertEqual(self.clock.sleeps, [0.5, 5.0])
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics["requests"], 3)
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["rate_limit_errors"], 2)
+        self.assertEqual(metrics["failures"], 0)
+
+    def test_gives_up_after_max_retries(self):
+        """最大リトライ回数を超えた場合とリトライ不可のエラーのテスト"""
+        service = build_fake_service([({"status": "503"}, "{}")] * 3)
+        scheduler = self.make_scheduler(max_retries=2)
+        with self.assertRaises(HttpError):
+            scheduler.execute(service.events().list(calendarId="primary"))
+        self.assertEqual(scheduler.get_metrics()["requests"], 3)
+        self.assertEqual(scheduler.get_metrics()["failures"], 1)
+
+        service = build_fake_service([({"status": "404"}, "{}")])
+        scheduler = self.make_scheduler()
+        with self.assertRaises(HttpError):
+            scheduler.execute(service.events().list(calendarId="primary"))
+        self.assertEqual(scheduler.get_metrics()["retries"], 0)
+
+    def test_non_idempotent_request_is_not_retried(self):
+        """retry=Falseを指定したリクエストはリトライしないテスト"""
+        service = build_fake_service([
+            ({"status": "503"}, "{}"),
+            ({"status": "200"}, json.dumps({"id": "channel"})),
+        ])
+        scheduler = self.make_scheduler()
+
+        with self.assertRaises(HttpError):
+            scheduler.execute(
+                service.events().watch(calendarId="primary", body={"id": "channel"}),
+                retry=False,
+            )
+
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics["requests"], 1)
+        self.assertEqual(metrics["retries"], 0)
+        self.assertEqual(metrics["failures"], 1)
+
+    def test_throttling(self):
+        """レート制限を超えるとスロットリングされるテスト"""
+        scheduler = self.make_scheduler(rate=1.0, burst=2)
+        request = MagicMock()
+        request.execute.return_value = {"items": []}
+
+        for _ in range(4):
+            scheduler.execute(request)
+
+        self.assertEqual(self.clock.sleeps, [1.0, 1.0])
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics["throttled"], 2)
+        self.assertEqual(metrics["throttled_seconds"], 2.0)
+
+    def test_coalesces_identical_in_flight_requests(self):
+        """同一の実行中リクエストが合流するテスト"""
+        scheduler = RequestScheduler()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_execute():
+            started.set()
+            release.wait(5)
+            return {"items": ["holiday"]}
+
+        first = MagicMock()
+        first.execute.side_effect = slow_execute
+        second = MagicMock()
+        results = []
+
+        owner = threading.Thread(target=lambda: results.append(scheduler.execute(first, key="k")))
+        owner.start()
+        started.wait(5)
+        waiter = threading.Thread(target=lambda: results.append(scheduler.execute(second, key="k")))
+        waiter.start()
+        # 合流したリクエストが登録されるまで待つ
+        while scheduler.get_metrics()["coalesced"] == 0:
+            threading.Event().wait(0.01)
+        release.set()
+        owner.join(5)
+        waiter.join(5)
+
+        self.assertEqual(results, [{"items": ["holiday"]}] * 2)
+        second.execute.assert_not_called()
+        self.assertEqual(scheduler.get_metrics()["requests"], 1)
+
+        # 完了後は新しいリクエストとして実行される
+        second.execute.return_value = {"items": []}
+        self.assertEqual(scheduler.execute(second, key="k"), {"items": []})
+
+
+
+def make_event(event_id, start, end, status="confirmed"):
+    """テスト用の時刻指定イベントを作成する"""
+    return {
+        "id": event_id,
+        "status": status,
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": end.isoformat()},
+    }
+
+
+class TestIncrementalRecomputation(unittest.TestCase):
+    def setUp(self):
+        self.jst = pytz.timezone("Asia/Tokyo")
+        # 2025-04-07（月）9:00 JSTを現在時刻とする
+        self.now = self.jst.localize(datetime.datetime(2025, 4, 7, 9, 0))
+        self.end = self.now + datetime.timedelta(days=14)
+        patchers = [
+            patch("main.get_now_jst", return_value=self.now),
+            patch("main.is_holiday", return_value=False),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def at(self, day, hour, minute=0):
+        return self.jst.localize(datetime.datetime(2025, 4, day, hour, minute))
+
+    def expected_slots(self, events, now=None):
+        """同じイベントで全期間を計算し直した結果"""
+        now = now or self.now
+        return find_available_slots(
+            FakeCalendarService(events), now, now + (self.end - self.now)
+        )
+
+    def test_apply_changes_recomputes_only_affected_days(self):
+        """変更のあった日だけ再計算し、全体再計算と同じ結果になるテスト"""
+        tuesday = make_event("a", self.at(8, 12), self.at(8, 13))
+        wednesday = make_event("b", self.at(9, 10), self.at(9, 11))
+        thursday = make_event("c", self.at(10, 14), self.at(10, 15))
+        service = build_fake_service([
+            ({"status": "200"}, json.dumps({
+                "items": [tuesday], "nextPageToken": "p2",
+            })),
+            ({"status": "200"}, json.dumps({
+                "items": [wednesday], "nextSyncToken": "sync-1",
+            })),
+            ({"status": "200"}, json.dumps({
+                "items": [dict(tuesday, status="cancelled"), thursday],
+                "nextSyncToken": "sync-2",
+            })),
+        ])
+        cache = AvailabilityCache(service, self.now, self.end)
+
+        cache.refresh()
+        self.assertEqual(cache.sync_token, "sync-1")
+        self.assertEqual(cache.slots(), self.expected_slots([tuesday, wednesday]))
+
+        with patch("main.find_day_slots", wraps=main_module.find_day_slots) as find_day_slots:
+            dates = cache.apply_changes()
+
+        # 変更のあった日に加え、今日は現在時刻で常に計算し直す
+        self.assertEqual(dates, [
+            datetime.date(2025, 4, 7), datetime.date(2025, 4, 8), datetime.date(2025, 4, 10),
+        ])
+        self.assertEqual(find_day_slots.call_count, 3)
+        self.assertEqual(cache.sync_token, "sync-2")
+        self.assertEqual(cache.slots(), self.expected_slots([wednesday, thursday]))
+
+    def test_changed_past_event_is_not_added_back(self):
+        """既に終わった予定が変更されても、現在時刻より前の空き時間を返さないテスト"""
+        now = self.jst.localize(datetime.datetime(2025, 4, 7, 12, 10))
+        upcoming = make_event("a", self.at(7, 14, 30), self.at(7, 15, 30))
+        past = make_event("b", self.at(7, 10), self.at(7, 11, 30))
+        service = build_fake_service([
+            ({"status": "200"}, json.dumps({"items": [upcoming], "nextSyncToken": "sync-1"})),
+            ({"status": "200"}, json.dumps({"items": [past], "nextSyncToken": "sync-2"})),
+        ])
+
+        with patch("main.get_now_jst", return_value=now):
+            cache = AvailabilityCache(service, now, now + datetime.timedelta(days=14))
+            cache.refresh()
+            cache.apply_changes()
+
+            slots = cache.slots()
+            self.assertEqual(slots[0]["start"], now)
+            self.assertEqual(slots, self.expected_slots([upcoming, past], now))
+
+    def test_rolls_forward_as_daemon(self):
+        """時間が経過しても、その時点で全体を計算し直した結果と一致するテスト"""
+        events = [
+            make_event(f"e{day}", self.at(7, 11) + datetime.timedelta(days=day),
+                       self.at(7, 12) + datetime.timedelta(days=day))
+            for day in range(40)
+        ]
+        cache = AvailabilityCache(FakeCalendarService(events), self.now, self.end)
+        cache.refresh()
+
+        # 同じ日の15:00（今日の空き時間は現在時刻から）と20日後
+        for now in (self.at(7, 15), self.at(27, 9)):
+            with patch("main.get_now_jst", return_value=now):
+                slots = cache.slots()
+                self.assertTrue(slots)
+                self.assertEqual(slots, self.expected_slots(events, now))
+
+    def test_expired_sync_token_triggers_full_refresh(self):
+        """同期トークンが無効（410）の場合は全体を再取得するテスト"""
+        event = make_event("a", self.at(8, 12), self.at(8, 13))
+        service = build_fake_service([
+            ({"status": "200"}, json.dumps({"items": [], "nextSyncToken": "sync-1"})),
+            ({"status": "410"}, json.dumps({"error": {"errors": [{"reason": "fullSyncRequired"}]}})),
+            ({"status": "200"}, json.dumps({"items": [event], "nextSyncToken": "sync-2"})),
+        ])
+        cache = AvailabilityCache(service, self.now, self.end)
+        cache.refresh()
+
+        dates = cache.apply_changes()
+
+        self.assertEqual(len(dates), 15)
+        self.assertEqual(cache.sync_token, "sync-2")
+        self.assertEqual(cache.slots(), self.expected_slots([event]))
+
+    def test_watch_events(self):
+        """変更通知チャンネル作成のテスト"""
+        service = MagicMock()
+        service.events().watch().execute.return_value = {"id": "ch", "resourceId": "r"}
+
+        channel = watch_events(service, "https://example.com/hook", channel_id="ch", token="t")
+
+        self.assertEqual(channel["resourceId"], "r")
+        body = service.events().watch.call_args.kwargs["body"]
+        self.assertEqual(body["id"], "ch")
+        self.assertEqual(body["type"], "web_hook")
+        self.assertEqual(body["address"], "https://example.com/hook")
+        self.assertEqual(body["token"], "t")
+
+
+class TestNotificationServer(unittest.TestCase):
+    def setUp(self):
+        self.cache = MagicMock()
+        self.cache.apply_changes.return_value = [datetime.date(2025, 4, 8)]
+        self.updates = queue.Queue()
+        self.server = NotificationServer(
+            ("127.0.0.1", 0), self.cache, "channel-1", token="secret",
+            on_update=self.updates.put,
+        )
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def notify(self, state, channel_id="channel-1", token="secret"):
+        """Google Calendarの通知を模したPOSTを送る"""
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self.server.server_address[1]}/",
+            data=b"",
+            method="POST",
+            headers={
+                "X-Goog-Channel-ID": channel_id,
+                "X-Goog-Channel-Token": token,
+                "X-Goog-Resource-State": state,
+                "X-Goog-Message-Number": "1",
+            },
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+
+    def test_change_notification_updates_cache(self):
+        """変更通知でキャッシュが差分更新されるテスト"""
+        self.assertEqual(self.notify("sync"), 200)
+        self.cache.apply_changes.assert_not_called()
+
+        self.assertEqual(self.notify("exists"), 200)
+        self.assertEqual(self.updates.get(timeout=5), [datetime.date(2025, 4, 8)])
+        self.cache.apply_changes.assert_called_once_with()
+
+    def test_responds_before_update_and_merges_notifications(self):
+        """更新を待たずに応答し、更新中に届いた通知を1回の更新にまとめるテスト"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def apply_changes():
+            started.set()
+            release.wait(5)
+            return [datetime.date(2025, 4, 8)]
+
+        self.cache.apply_changes.side_effect = apply_changes
+
+        self.assertEqual(self.notify("exists"), 200)
+        self.assertTrue(started.wait(5))
+        # 更新中でもすぐに応答する
+        self.assertEqual(self.notify("exists"), 200)
+        self.assertEqual(self.notify("not_exists"), 200)
+        release.set()
+
+        self.updates.get(timeout=5)
+        self.updates.get(timeout=5)
+        self.assertEqual(self.cache.apply_changes.call_count, 2)
+
+    def test_update_failure_keeps_serving(self):
+        """キャッシュの更新に失敗しても次の通知を処理するテスト"""
+        self.cache.apply_changes.side_effect = [
+            ConnectionError("reset"), [datetime.date(2025, 4, 9)],
+        ]
+        with patch("sys.stderr", new_callable=StringIO) as stderr:
+            self.assertEqual(self.server.update(), [])
+        self.assertIn("reset", stderr.getvalue())
+
+        self.assertEqual(self.notify("exists"), 200)
+        self.assertEqual(self.updates.get(timeout=5), [datetime.date(2025, 4, 9)])
+
+    def test_rejects_unknown_channel(self):
+        """登録していないチャンネル・不正なトークンの通知を拒否するテスト"""
+        for kwargs in ({"channel_id": "other"}, {"token": "wrong"}):
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                self.notify("exists", **kwargs)
+            self.assertEqual(context.exception.code, 403)
+        self.cache.apply_changes.assert_not_called()
+
+    def test_channel_renewal_delay(self):
+        """有効期限の手前でチャンネルを作り直すまでの待機時間のテスト"""
+        now = 1_700_000_000.0
+        channel = {"id": "channel-1", "expiration": str(int((now + 3 * 24 * 3600) * 1000))}
+        self.assertEqual(
+            get_channel_renewal_delay(channel, now=now),
+            3 * 24 * 3600 - WATCH_RENEW_MARGIN_SECONDS,
+        )
+        # 期限間近・期限切れならすぐに作り直す
+        channel["expiration"] = str(int((now + 60) * 1000))
+        self.assertEqual(get_channel_renewal_delay(channel, now=now), 0.0)
+        # 有効期限が返されなかった場合は要求したTTLを使う
+        self.assertEqual(
+            get_channel_renewal_delay({"id": "channel-1"}, now=now),
+            WATCH_CHANNEL_TTL_SECONDS - WATCH_RENEW_MARGIN_SECONDS,
+        )
+
+    def test_renewal_survives_stop_failure(self):
+        """古いチャンネルの停止に失敗しても新しいチャンネルに切り替えるテスト"""
+        service = MagicMock()
+        new_channel = {"id": "channel-2", "resourceId": "resource-2"}
+        stop_error = HttpError(MagicMock(status=404), b"Channel not found")
+        with patch("main.watch_events", return_value=new_channel) as watch, \
+                patch("main.stop_watch", side_effect=stop_error) as stop, \
+                patch("sys.stderr", new_callable=StringIO) as stderr:
+            channel = renew_watch_channel(
+                service, self.server, {"id": "channel-1", "resourceId": "resource-1"},
+                "https://example.com/notify", token="secret",
+            )
+
+        self.assertEqual(channel, new_channel)
+        self.assertEqual(self.server.channel_id, "channel-2")
+        watch.assert_called_once_with(service, "https://example.com/notify", token="secret")
+        stop.assert_called_once_with(service, {"id": "channel-1", "resourceId": "resource-1"})
+        self.assertIn("古い通知チャンネルの停止に失敗しました", stderr.getvalue())
+
+        # 作り直しに失敗した場合は現在のチャンネルのまま
+        with patch("main.watch_events", side_effect=ConnectionError("reset")), \
+                patch("sys.stderr", new_callable=StringIO):
+            self.assertIsNone(renew_watch_channel(
+                service, self.server, channel, "https://example.com/notify"
+            ))
+        self.assertEqual(self.server.channel_id, "channel-2")
+
+
+
+class TestUtilizationAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.jst = pytz.timezone("Asia/Tokyo")
+
+    def at(self, month, day, hour, minute=0):
+        return self.jst.localize(datetime.datetime(2025, month, day, hour, minute))
+
+    def test_iter_calendar_events_streams_chunks(self):
+        """期間を分割して取得し、境界をまたぐイベントを重複させないテスト"""
+        spanning = make_event("span", self.at(4, 10, 23), self.at(4, 11, 1))
+        service = build_fake_service([
+            ({"status": "200"}, json.dumps({
+                "items": [make_event("a", self.at(4, 8, 10), self.at(4, 8, 11))],
+                "nextPageToken": "p2",
+            })),
+            ({"status": "200"}, json.dumps({"items": [spanning]})),
+            ({"status": "200"}, json.dumps({
+                "items": [spanning, make_event("b", self.at(4, 12, 10), self.at(4, 12, 11))],
+            })),
+        ])
+
+        events = list(iter_calendar_events(
+            service, self.at(4, 7, 0), self.at(4, 14, 0), chunk_days=4
+        ))
+
+        self.assertEqual([event["id"] for event in events], ["a", "span", "b"])
+
+    def test_get_holiday_dates(self):
+        """祝日カレンダーから祝日の日付を取得するテスト"""
+        service = MagicMock()
+        service.events().list().execute.return_value = {"items": [
+            {"start": {"date": "2025-04-29"}, "end": {"date": "2025-04-30"}},
+            {"start": {"date": "2025-05-03"}, "end": {"date": "2025-05-05"}},
+        ]}
+
+        holidays = get_holiday_dates(service, self.at(4, 1, 0), self.at(6, 1, 0))
+
+        self.assertEqual(holidays, {
+            datetime.date(2025, 4, 29), datetime.date(2025, 5, 3), datetime.date(2025, 5, 4),
+        })
+
+    def test_summary(self):
+        """予定率・会議負荷・空き時間推移の集計テスト"""
+        # 2025-04-07（月）から2週間、4/8（火）は祝日
+        analyzer = UtilizationAnalyzer(
+            self.at(4, 7, 0), self.at(4, 21, 0), holidays={datetime.date(2025, 4, 8)}
+        )
+        analyzer.add_events([
+            # 重なる予定は結合して10:00-12:00として集計する
+            make_event("a", self.at(4, 7, 10), self.at(4, 7, 11, 30)),
+            make_event("b", self.at(4, 7, 11), self.at(4, 7, 12)),
+            # 営業時間外の予定はヒートマップのみに反映する
+            make_event("c", self.at(4, 9, 19), self.at(4, 9, 20)),
+            make_event("d", self.at(4, 14, 10), self.at(4, 14, 10, 30)),
+            {"id": "all-day", "start": {"date": "2025-04-15"}, "end": {"date": "2025-04-16"}},
+        ])
+
+        summary = analyzer.summary()
+
+        self.assertEqual(summary["events"], 4)
+        self.assertEqual(summary["business_days"], 9)
+        self.assertEqual(summary["heatmap"]["Mon"][10], 0.75)
+        self.assertEqual(summary["heatmap"]["Mon"][11], 0.5)
+        self.assertEqual(summary["heatmap"]["Wed"][19], 0.5)
+        self.assertEqual(summary["heatmap"]["Tue"][10], 0.0)
+
+        load = summary["meeting_load"]
+        self.assertEqual(load["max"], 2.0)
+        self.assertEqual(load["p50"], 0.0)
+        self.assertAlmostEqual(load["mean"], 2.5 / 9)
+
+        monthly = summary["free_time_trend"]["monthly"]
+        self.assertEqual(len(monthly), 1)
+        self.assertEqual(monthly[0]["business_days"], 9)
+        self.assertEqual(monthly[0]["free_hours"], 9 * 8 - 2.5)
+        # 1週目: (4日×8時間-2時間)/4日、2週目: (5日×8時間-0.5時間)/5日
+        self.assertAlmostEqual(summary["free_time_trend"]["slope_hours_per_day"], 39.5 / 5 - 30.0 / 4)
+
+        text = format_analytics_text(summary)
+        self.assertIn("Busy-hour heatmap", text)
+        self.assertIn("p95", text)
+        self.assertIn("2025-04", text)
+
+    def test_empty_calendar_has_flat_trend(self):
+        """予定のないカレンダーは開始曜日や祝日によらず空き時間の傾きが0になるテスト"""
+        holidays = {datetime.date(2025, 4, 29), datetime.date(2025, 5, 5), datetime.date(2025, 5, 6)}
+        # 月曜・水曜・金曜から始まる365日間
+        for day in (7, 9, 11):
+            with self.subTest(day=day):
+                start = self.at(4, day, 0)
+                analyzer = UtilizationAnalyzer(start, start + datetime.timedelta(days=365), holidays)
+                summary = analyzer.summary()
+                self.assertEqual(summary["free_time_trend"]["slope_hours_per_day"], 0.0)
+
+    def test_parse_datetime(self):
+        """RFC3339形式と汎用形式の日時文字列の解析テスト"""
+        self.assertEqual(
+            parse_datetime("2025-04-01T10:00:00Z"),
+            datetime.datetime(2025, 4, 1, 10, 0, tzinfo=pytz.UTC),
+        )
+        self.assertEqual(
+            to_jst(parse_datetime("2025-04-01T10:00:00+09:00")),
+            self.at(4, 1, 10),
+        )
+        self.assertEqual(parse_datetime("April 1 2025 10:00"), datetime.datetime(2025, 4, 1, 10, 0))
+
+    def test_percentile(self):
+        """線形補間によるパーセンタイル計算のテスト"""
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 50), 2.5)
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 100), 4.0)
+        self.assertEqual(percentile([5.0], 90), 5.0)
+
+    def test_year_of_busy_calendar(self):
+        """1年分の予定が多いカレンダーを集計できるテスト（実行時間はperf_baseline.jsonで確認する）"""
+        start = self.jst.localize(datetime.datetime(2024, 4, 1))
+        events = []
+        day = start
+        while day < start + datetime.timedelta(days=365):
+            for hour in range(9, 19):
+                begin = day.replace(hour=hour, minute=15)
+                events.append(make_event(f"{day:%Y%m%d}{hour}", begin, begin + datetime.timedelta(minutes=45)))
+            day += datetime.timedelta(days=1)
+
+        analyzer = UtilizationAnalyzer(start, start + datetime.timedelta(days=365))
+        analyzer.add_events(iter(events))
+        summary = analyzer.summary()
+
+        self.assertEqual(summary["events"], 3650)
+        self.assertAlmostEqual(summary["heatmap"]["Mon"][10], 0.75)
+
+    def test_analytics_days_must_be_positive(self):
+        """--analyticsの日数に0以下を指定できないテスト"""
+        parser = setup_arg_parser()
+        self.assertEqual(parser.parse_args(["--analytics"]).analytics, ANALYTICS_DEFAULT_DAYS)
+        self.assertEqual(parser.parse_args(["--analytics", "30"]).analytics, 30)
+        for value in ("0", "-5", "abc"):
+            with self.subTest(value=value), patch("sys.stderr", new_callable=StringIO), \
+                    self.assertRaises(SystemExit):
+                parser.parse_args(["--analytics", value])
+
+
+
+class TestWindowPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.jst = pytz.timezone("Asia/Tokyo")
+        # 2025-04-07（月）12:00 JSTを現在時刻とする
+        self.now = self.at(7, 12)
+        patchers = [
+            patch("main.get_now_jst", return_value=self.now),
+            # 日ごとの祝日判定でスロットリングされないようにする
+            patch("main._request_scheduler", RequestScheduler(rate=1000.0, burst=1000)),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.service = FakeCalendarService(
+            events=[
+                make_event("past", self.at(7, 10), self.at(7, 11)),
+                make_event("today", self.at(7, 14), self.at(7, 15)),
+                make_event("tue", self.at(8, 12), self.at(8, 13)),
+                make_event("next", self.at(15, 11), self.at(15, 16)),
+            ],
+            holidays=[datetime.date(2025, 4, 9)],
+        )
+
+    def at(self, day, hour):
+        return self.jst.localize(datetime.datetime(2025, 4, day, hour, 0))
+
+    def make_prefetcher(self, service=None):
+        prefetcher = WindowPrefetcher(service or self.service)
+        self.addCleanup(prefetcher.close)
+        return prefetcher
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_interactive_pages_show_their_period(self, mock_stdout):
+        """対話モードの各ページのヘッダーにそのページの期間を表示するテスト"""
+        args = MagicMock(
+            include_holidays=False, available_slots=1.0, format="text",
+            show_total_hours=False, weekday_lang="ja",
+        )
+        with patch("builtins.input", side_effect=["", "q"]):
+            run_interactive_mode(self.service, args, self.now)
+
+        output = mock_stdout.getvalue()
+        self.assertIn("hours from 2025-04-07 to 2025-04-14", output)
+        self.assertIn("hours from 2025-04-14 to 2025-04-21", output)
+        self.assertNotIn("for the next", output)
+
+    def test_window_matches_find_available_slots(self):
+        """取得済みデータからの検索がfind_available_slotsと一致するテスト"""
+        start = self.at(7, 0)
+        end = self.at(21, 0)
+        window = fetch_calendar_window(self.service, start, end)
+
+        for include_holidays in (False, True):
+            self.assertEqual(
+                find_slots_in_window(window, include_holidays=include_holidays),
+                find_available_slots(self.service, start, end, include_holidays=include_holidays),
+            )
+
+    def test_next_window_is_served_from_prefetch(self):
+        """次の期間が先読みされ、キャッシュから返されるテスト"""
+        prefetcher = self.make_prefetcher()
+        week = datetime.timedelta(days=7)
+
+        first = prefetcher.find_available_slots(self.now, self.now + week)
+        self.assertEqual(first, find_available_slots(self.service, self.now, self.now + week))
+
+        # 先読みの完了を待ってから次のページを要求する
+        prefetcher.prefetch(self.now + week, self.now + 2 * week).result(5)
+        second = prefetcher.find_available_slots(self.now + week, self.now + 2 * week)
+
+        self.assertEqual(
+            second,
+            find_available_slots(self.service, self.now + week, self.now + 2 * week),
+        )
+        metrics = prefetcher.get_metrics()
+        self.assertEqual(metrics["misses"], 1)
+        self.assertEqual(metrics["hits"], 1)
+        self.assertEqual(metrics["prefetched"], 2)
+
+    def test_query_change_cancels_pending_prefetch(self):
+        """想定外の期間が要求された場合に未実行の先読みを取り消すテスト"""
+        gate = threading.Event()
+        service = FakeCalendarService(gate=gate)
+        prefetcher = self.make_prefetcher(service)
+        week = datetime.timedelta(days=7)
+
+        # 1件目の取得中に2件目の先読みを登録する
+        running = prefetcher.prefetch(self.now, self.now + week)
+        service.started.wait(5)
+        queued = prefetcher.prefetch(self.now + week, self.now + 2 * week)
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            prefetcher.get_window(self.now + 4 * week, self.now + 5 * week)
+        ))
+        thread.start()
+        while prefetcher.get_metrics()["cancelled"] == 0:
+            threading.Event().wait(0.01)
+        gate.set()
+        thread.join(5)
+
+        self.assertTrue(queued.cancelled())
+        self.assertFalse(running.cancelled())
+        self.assertEqual(results[0].start_date, self.now + 4 * week)
+        self.assertEqual(prefetcher.get_metrics()["misses"], 1)
+
+
+
+class FakeCalendarHandler(BaseHTTPRequestHandler):
+    """Calendar APIのevents.listとfreeBusyを模したリクエストハンドラ"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        calendar_id = unquote(parts.path.split("/")[-2])
+        params = dict(parse_qsl(parts.query), calendarId=calendar_id)
+        self.respond(lambda: self.server.calendar._execute(params))
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time_min = parse_datetime(body["timeMin"])
+        time_max = parse_datetime(body["timeMax"])
+
+        def free_busy():
+            busy = [
+                {"start": event["start"]["dateTime"], "end": event["end"]["dateTime"]}
+                for event in self.server.calendar.events_data
+                if "dateTime" in event["start"]
+                and parse_datetime(event["end"]["dateTime"]) > time_min
+                and parse_datetime(event["start"]["dateTime"]) < time_max
+            ]
+            return {"calendars": {item["id"]: {"busy": busy} for item in body["items"]}}
+
+        self.respond(free_busy)
+
+    def respond(self, payload):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            status = server.failures.pop(0) if server.failures else 200
+        try:
+            time.sleep(server.delay)
+            if status != 200:
+                body = json.dumps({"error": {"code": status, "errors": [{"reason": "backendError"}]}})
+            else:
+                body = json.dumps(payload())
+        finally:
+            with server.lock:
+                server.active -= 1
+
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if server.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(data), 64):
+                chunk = data[start:start + 64]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeCalendarHTTPServer(ThreadingHTTPServer):
+    """FakeCalendarServiceのデータを返すローカルのCalendar APIサーバー"""
+
+    daemon_threads = True
+
+    def __init__(self, calendar, failures=(), delay=0.0, chunked=False):
+        super().__init__(("127.0.0.1", 0), FakeCalendarHandler)
+        self.calendar = calendar
+        self.failures = list(failures)
+        self.delay = delay
+        self.chunked = chunked
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.connections = set()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/calendar/v3"
+
+
+class TestAsyncCalendarClient(unittest.TestCase):
+    def setUp(self):
+        self.jst = pytz.timezone("Asia/Tokyo")
+        self.now = self.at(7, 12)
+        patcher = patch("main.get_now_jst", return_value=self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = RequestScheduler(rate=1000.0, burst=1000, backoff_base=0.001)
+
+        self.calendar = FakeCalendarService(
+            events=[
+                make_event("past", self.at(7, 10), self.at(7, 11)),
+                make_event("today", self.at(7, 14), self.at(7, 15)),
+                make_event("tue", self.at(8, 12), self.at(8, 13)),
+                make_event("fri", self.at(11, 10), self.at(11, 17)),
+                make_event("next", self.at(15, 11), self.at(15, 16)),
+            ],
+            holidays=[datetime.date(2025, 4, 9)],
+        )
+
+    def at(self, day, hour):
+        return self.jst.localize(datetime.datetime(2025, 4, day, hour, 0))
+
+    def start_server(self, **kwargs):
+        server = FakeCalendarHTTPServer(self.calendar, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def make_client(self, server, max_connections=2):
+        transport = AsyncHttpTransport(max_connections=max_connections, timeout=5)
+        return AsyncCalendarClient(
+            transport=transport, scheduler=self.scheduler, base_url=server.base_url
+        )
+
+    def test_matches_sync_slots(self):
+        """非同期版が同期版と同じ空き時間を返すテスト"""
+        server = self.start_server()
+        end = self.at(21, 0)
+
+        async def lookup(include_holidays):
+            async with self.make_client(server) as client:
+                return await find_available_slots_async(
+                    client, self.at(7, 0), end, include_holidays=include_holidays
+                )
+
+        with patch("main._request_scheduler", self.scheduler):
+            for include_holidays in (False, True):
+                self.assertEqual(
+                    asyncio.run(lookup(include_holidays)),
+                    find_available_slots(
+                        self.calendar, self.at(7, 0), end, include_holidays=include_holidays
+                    ),
+                )
+
+    def test_concurrent_lookups_share_connection_pool(self):
+        """同時実行数を制限し、接続を再利用して並行に検索するテスト"""
+        server = self.start_server(delay=0.02)
+
+        async def lookups():
+            async with self.make_client(server, max_connections=3) as client:
+                results = await asyncio.gather(*[
+                    find_available_slots_async(
+                        client, self.now + datetime.timedelta(hours=i), self.at(21, 0)
+                    )
+                    for i in range(8)
+                ])
+                return results
+
+        results = asyncio.run(lookups())
+
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(results))
+        self.assertLessEqual(server.max_active, 3)
+        self.assertLessEqual(len(server.connections), 3)
+        self.assertEqual(self.scheduler.get_metrics()["requests"], 16)
+
+    def test_free_busy_with_retries(self):
+        """エラー時にリトライし、チャンク形式のfreeBusyレスポンスを解析するテスト"""
+        server = self.start_server(failures=[429, 503], chunked=True)
+
+        async def free_busy():
+            async with self.make_client(server) as client:
+                return await get_free_busy_async(client, self.at(8, 0), self.at(12, 0))
+
+        busy = asyncio.run(free_busy())
+
+        self.assertEqual(busy, [(self.at(8, 12), self.at(8, 13)), (self.at(11, 10), self.at(11, 17))])
+        metrics = self.scheduler.get_metrics()
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["rate_limit_errors"], 1)
+
+    def test_non_retryable_error(self):
+        """リトライ対象外のエラーはHttpErrorとして送出されるテスト"""
+        server = self.start_server(failures=[404])
+
+        async def lookup():
+            async with self.make_client(server) as client:
+                await get_free_busy_async(client, self.at(8, 0), self.at(12, 0))
+
+        with self.assertRaises(HttpError) as context:
+            asyncio.run(lookup())
+        self.assertEqual(context.exception.resp.status, 404)
+
+    def test_timeout_is_retried(self):
+        """タイムアウトしたリクエストをリトライするテスト"""
+        server = self.start_server(delay=0.5)
+        scheduler = RequestScheduler(rate=1000.0, burst=1000, backoff_base=0.001, max_retries=1)
+        client = AsyncCalendarClient(
+            transport=AsyncHttpTransport(timeout=0.1), scheduler=scheduler, base_url=server.base_url
+        )
+
+        async def free_busy():
+            async with client:
+                await get_free_busy_async(client, self.at(8, 0), self.at(12, 0))
+
+        with self.assertRaises(Exception) as context:
+            asyncio.run(free_busy())
+        self.assertIsInstance(context.exception, asyncio.TimeoutError)
+        self.assertEqual(scheduler.get_metrics()["retries"], 1)
+
+    def test_concurrent_requests_refresh_token_once(self):
+        """期限切れのトークンを並行するリクエストが1回だけ更新するテスト"""
+        server = self.start_server()
+        credentials = MagicMock(access_token=None, access_token_expired=True)
+
+        def refresh(http):
+            time.sleep(0.05)
+            credentials.access_token = "token"
+            credentials.access_token_expired = False
+
+        credentials.refresh.side_effect = refresh
+        client = AsyncCalendarClient(
+            credentials=credentials, transport=AsyncHttpTransport(timeout=5),
+            scheduler=self.scheduler, base_url=server.base_url,
+        )
+
+        async def lookups():
+            async with client:
+                return await asyncio.gather(*[
+                    get_free_busy_async(client, self.at(8, 0), self.at(8 + i, 0))
+                    for i in range(1, 5)
+                ])
+
+        self.assertEqual(len(asyncio.run(lookups())), 4)
+        credentials.refresh.assert_called_once()
+
+    def test_client_reused_across_event_loops(self):
+        """同じクライアントを別のイベントループで再利用できるテスト"""
+        server = self.start_server(delay=0.02)
+        credentials = MagicMock(access_token=None, access_token_expired=True)
+
+        def refresh(http):
+            time.sleep(0.02)
+            credentials.access_token = "token"
+            credentials.access_token_expired = False
+
+        credentials.refresh.side_effect = refresh
+        client = AsyncCalendarClient(
+            credentials=credentials, transport=AsyncHttpTransport(max_connections=1, timeout=5),
+            scheduler=self.scheduler, base_url=server.base_url,
+        )
+
+        async def lookups():
+            # 接続数1のセマフォとトークン更新のロックを並行するリクエストで取り合う
+            credentials.access_token_expired = True
+            try:
+                return await asyncio.gather(*[
+                    get_free_busy_async(client, self.at(8, 0), self.at(8 + i, 0))
+                    for i in range(1, 4)
+                ])
+            finally:
+                await client.close()
+
+        for _ in range(2):
+            self.assertEqual(len(asyncio.run(lookups())), 3)
+        self.assertEqual(credentials.refresh.call_count, 2)
+
+
+
+def reference_find_available_slots(events, holidays, start_date, end_date, now_jst,
+                                   include_holidays=False, min_hours=1.0):
+    """find_available_slotsの現在の仕様をそのまま書き下した参照実装
+
+    高速化した実装やバックエンドの結果を比較するための基準であり、最適化はしない。
+    APIのtimeMin/timeMaxによる絞り込みと祝日カレンダーの照会もここで再現する。
+    """
+    jst = pytz.timezone("Asia/Tokyo")
+    start_date = max(start_date.astimezone(jst), now_jst)
+    end_date = end_date.astimezone(jst)
+
+    # APIは検索期間と重なる予定だけを開始時刻順（orderBy=startTime、同時刻は終了時刻順）に返し、
+    # 終日イベントは空き時間の計算に使わない
+    busy_periods = []
+    for event in events:
+        if "dateTime" not in event["start"] or "dateTime" not in event["end"]:
+            continue
+        start = date_parser.parse(event["start"]["dateTime"]).astimezone(jst)
+        end = date_parser.parse(event["end"]["dateTime"]).astimezone(jst)
+        if end > start_date and start < end_date:
+            busy_periods.append((start, end))
+    busy_periods.sort()
+
+    buffer = datetime.timedelta(minutes=BUFFER_MINUTES)
+    min_duration = datetime.timedelta(hours=min_hours)
+
+    def slot(start, end):
+        return {"start": start, "end": end, "duration": (end - start).total_seconds() / 3600}
+
+    slots = []
+    current_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    while current_date <= end_date:
+        day = current_date.date()
+        day_start = current_date.replace(hour=BUSINESS_HOURS_START)
+        day_end = current_date.replace(hour=BUSINESS_HOURS_END)
+        if current_date.weekday() < 5 and (include_holidays or day not in holidays) \
+                and day_end >= now_jst:
+            effective_start = day_start + buffer
+            effective_end = day_end - buffer
+            if effective_start < now_jst < effective_end and day == now_jst.date():
+                effective_start = now_jst
+
+            # 開始日がこの日の予定を営業時間で切り詰め、切り詰めた開始時刻で安定ソートする
+            # （切り詰め後に開始時刻が同じ予定は、元の開始時刻順のまま残る）
+            day_busy = [
+                (max(day_start, start), min(day_end, end))
+                for start, end in busy_periods
+                if start.date() == day and end > day_start and start < day_end
+            ]
+            day_busy.sort(key=lambda period: period[0])
+
+            if not day_busy:
+                slots.append(slot(effective_start, effective_end))
+            else:
+                if day_busy[0][0] > effective_start + min_duration:
+                    slots.append(slot(effective_start, day_busy[0][0] - buffer))
+                for i in range(len(day_busy) - 1):
+                    gap_start = day_busy[i][1] + buffer
+                    gap_end = day_busy[i + 1][0] - buffer
+                    if gap_end - gap_start >= min_duration:
+                        slots.append(slot(gap_start, gap_end))
+                if effective_end > day_busy[-1][1] + min_duration:
+                    slots.append(slot(day_busy[-1][1] + buffer, effective_end))
+
+        current_date += datetime.timedelta(days=1)
+
+    return slots
+
+
+class RandomCalendarCase:
+    """乱数で生成したカレンダーと検索条件"""
+
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        jst = pytz.timezone("Asia/Tokyo")
+        minutes = lambda low, high: datetime.timedelta(minutes=rng.randrange(low, high, 5))
+
+        self.seed = seed
+        base = jst.localize(datetime.datetime(2025, 3, 3)) + datetime.timedelta(days=rng.randrange(90))
+        days = rng.randint(1, 21)
+        self.start_date = base + minutes(0, 24 * 60)
+        self.end_date = self.start_date + datetime.timedelta(days=days) + minutes(0, 24 * 60)
+        # 現在時刻は検索開始前から検索終了前までの範囲
+        span = int((self.end_date - self.start_date).total_seconds() // 60)
+        self.now = self.start_date + minutes(-2 * 24 * 60, span)
+        self.min_hours = rng.choice([0.5, 1.0, 1.5, 2.0, 3.0])
+        self.include_holidays = rng.random() < 0.3
+        self.holidays = {
+            (base + datetime.timedelta(days=rng.randrange(days + 2))).date()
+            for _ in range(rng.randint(0, 3))
+        }
+
+        self.events = []
+        for i in range(rng.randint(0, days * 8)):
+            start = base + datetime.timedelta(days=rng.randrange(-1, days + 2)) + minutes(6 * 60, 21 * 60)
+            if rng.random() < 0.05:
+                # 終日イベント
+                self.events.append({
+                    "id": f"all-day-{i}",
+                    "start": {"date": start.date().isoformat()},
+                    "end": {"date": (start.date() + datetime.timedelta(days=1)).isoformat()},
+                })
+                continue
+
+            end = start + rng.choice([
+                datetime.timedelta(minutes=rng.choice([15, 30, 45, 60, 90, 120, 240])),
+                minutes(5, 16 * 60),
+            ])
+            if rng.random() < 0.5:
+                # UTCで返されるイベント
+                start, end = start.astimezone(pytz.UTC), end.astimezone(pytz.UTC)
+            self.events.append(make_event(f"e{i}", start, end))
+
+    def service(self):
+        return FakeCalendarService(self.events, self.holidays)
+
+    def reference(self):
+        return reference_find_available_slots(
+            self.events, self.holidays, self.start_date, self.end_date, self.now,
+            self.include_holidays, self.min_hours,
+        )
+
+
+def run_find_available_slots(case, context):
+    return find_available_slots(
+        case.service(), case.start_date, case.end_date, case.include_holidays, case.min_hours
+    )
+
+def run_find_slots_in_window(case, context):
+    window = fetch_calendar_window(case.service(), case.start_date, case.end_date)
+    return find_slots_in_window(window, case.include_holidays, case.min_hours)
+
+def run_window_prefetcher(case, context):
+    prefetcher = WindowPrefetcher(case.service())
+    try:
+        return prefetcher.find_available_slots(
+            case.start_date, case.end_date, case.include_holidays, case.min_hours
+        )
+    finally:
+        prefetcher.close()
+
+def run_availability_cache(case, context):
+    cache = AvailabilityCache(
+        case.service(), case.start_date, case.end_date, case.include_holidays, case.min_hours
+    )
+    cache.refresh()
+    return cache.slots()
+
+def run_availability_cache_incremental(case, context):
+    """一部のイベントで計算した後、残りを同期トークンの変更として届けて差分更新する
+
+    変更前のイベントの変更（過去の予定を含む）・追加・削除を2回に分けて、
+    現在時刻を進めながら反映する。
+    """
+    rng = random.Random(case.seed)
+    refresh_now = case.now - datetime.timedelta(minutes=rng.randrange(0, 3 * 24 * 60, 5))
+    # 検索期間が現在時刻に合わせて進んだ結果、ちょうど検索終了日時までになるように作成する
+    end_date = case.end_date - (
+        max(case.start_date, case.now) - max(case.start_date, refresh_now)
+    )
+
+    initial, changes = [], []
+    for event in case.events:
+        choice = rng.random()
+        if choice < 0.5:
+            initial.append(event)
+        elif choice < 0.8 and "dateTime" in event["start"]:
+            # 変更前のイベントは日時をずらしておく
+            delta = datetime.timedelta(minutes=rng.randrange(-24 * 60, 24 * 60, 5))
+            initial.append(make_event(
+                event["id"],
+                parse_datetime(event["start"]["dateTime"]) + delta,
+                parse_datetime(event["end"]["dateTime"]) + delta,
+            ))
+            changes.append(event)
+        else:
+            changes.append(event)
+    for i in range(rng.randint(0, 5)):
+        # 現在時刻の前後の予定を削除する
+        start = case.now + datetime.timedelta(minutes=rng.randrange(-24 * 60, 24 * 60, 5))
+        initial.append(make_event(f"cancelled-{i}", start, start + datetime.timedelta(hours=1)))
+        changes.append({"id": f"cancelled-{i}", "status": "cancelled"})
+    rng.shuffle(changes)
+
+    service = FakeCalendarService(initial, case.holidays)
+    cache = AvailabilityCache(
+        service, case.start_date, end_date, case.include_holidays, case.min_hours
+    )
+    with patch("main.get_now_jst", return_value=refresh_now):
+        cache.refresh()
+
+    split = len(changes) // 2
+    middle_now = refresh_now + (case.now - refresh_now) / 2
+    for now, batch in ((middle_now, changes[:split]), (case.now, changes[split:])):
+        service.change(batch)
+        with patch("main.get_now_jst", return_value=now):
+            cache.apply_changes()
+    return cache.slots()
+
+def run_find_available_slots_async(case, context):
+    server = context["server"]
+    server.calendar = case.service()
+
+    async def lookup():
+        async with AsyncCalendarClient(
+            transport=AsyncHttpTransport(timeout=5),
+            scheduler=context["scheduler"],
+            base_url=server.base_url,
+        ) as client:
+            return await find_available_slots_async(
+                client, case.start_date, case.end_date, case.include_holidays, case.min_hours
+            )
+
+    return asyncio.run(lookup())
+
+
+# 空き時間検索の実装・バックエンドを追加した場合はここに登録する
+SLOT_ENGINES = {
+    "find_available_slots": run_find_available_slots,
+    "find_slots_in_window": run_find_slots_in_window,
+    "WindowPrefetcher": run_window_prefetcher,
+    "AvailabilityCache": run_availability_cache,
+    "AvailabilityCache.apply_changes": run_availability_cache_incremental,
+    "find_available_slots_async": run_find_available_slots_async,
+}
+
+
+class TestSlotSearchRegression(unittest.TestCase):
+    """空き時間検索の実装が参照実装と一致し、性能が基準値から劣化していないことを確認する"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scheduler = RequestScheduler(rate=1e6, burst=1e6)
+        cls.server = FakeCalendarHTTPServer(FakeCalendarService())
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        patcher = patch("main._request_scheduler", self.scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reference_implementation(self):
+        """参照実装自体が仕様どおりであることの確認"""
+        jst = pytz.timezone("Asia/Tokyo")
+        at = lambda hour, minute=0: jst.localize(datetime.datetime(2025, 4, 8, hour, minute))
+        events = [make_event("a", at(12), at(13)), make_event("b", at(14), at(14, 30))]
+
+        slots = reference_find_available_slots(events, set(), at(0), at(23), at(9))
+        self.assertEqual([(slot["start"], slot["end"]) for slot in slots], [
+            (at(10, 30), at(11, 30)),
+            (at(15), at(17, 30)),
+        ])
+
+        # 営業時間中は現在時刻から検索し、最初の予定までがちょうど最小時間の場合は含めない
+        slots = reference_find_available_slots(events, set(), at(0), at(23), at(11))
+        self.assertEqual([(slot["start"], slot["end"]) for slot in slots], [
+            (at(15), at(17, 30)),
+        ])
+
+    def test_engines_match_reference(self):
+        """乱数で生成したカレンダーで、すべての実装が参照実装と一致するテスト"""
+        context = {"server": self.server, "scheduler": self.scheduler}
+        for seed in range(DIFFERENTIAL_CASES):
+            case = RandomCalendarCase(seed)
+            expected = case.reference()
+            with patch("main.get_now_jst", return_value=case.now):
+                for name, engine in SLOT_ENGINES.items():
+                    with self.subTest(engine=name, seed=seed):
+                        self.assertEqual(engine(case, context), expected)
+
+    def measure(self, func, repeat=5):
+        """関数の実行時間（秒、最小値）を計測する"""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    @unittest.skipUnless(
+        os.environ.get("RUN_PERF_BASELINE") or os.environ.get("UPDATE_PERF_BASELINE"),
+        "実行時間はマシンの負荷で変わるため、RUN_PERF_BASELINE=1 を指定した場合のみ実行する",
+    )
+    def test_performance_baseline(self):
+        """性能が基準値（perf_baseline.json）から劣化していないことを確認するテスト
+
+        RUN_PERF_BASELINE=1 を指定した場合のみ実行する。
+        UPDATE_PERF_BASELINE=1 を指定して実行すると、計測値で基準値を更新する。
+        """
+        jst = pytz.timezone("Asia/Tokyo")
+        start = jst.localize(datetime.datetime(2025, 4, 7))
+        now = start + datetime.timedelta(hours=9)
+        events = []
+        for day in range(120):
+            for hour in range(8, 20):
+                begin = start + datetime.timedelta(days=day, hours=hour, minutes=15 * (day % 4))
+                events.append(make_event(f"{day}-{hour}", begin, begin + datetime.timedelta(minutes=40)))
+        service = FakeCalendarService(events, holidays=[datetime.date(2025, 4, 29)])
+        window = fetch_calendar_window(service, start, start + datetime.timedelta(days=90))
+
+        cache = AvailabilityCache(service, start, start + datetime.timedelta(days=90))
+        with patch("main.get_now_jst", return_value=now):
+            cache.refresh()
+        moved = make_event("4-10", start + datetime.timedelta(days=4, hours=11),
+                           start + datetime.timedelta(days=4, hours=12))
+        cache_service = MagicMock()
+        cache_service.events().list().execute.return_value = {
+            "items": [moved], "nextSyncToken": "next",
+        }
+        cache.service = cache_service
+
+        def apply_changes():
+            cache.sync_token = "token"
+            cache.apply_changes()
+
+        def analytics():
+            analyzer = UtilizationAnalyzer(start, start + datetime.timedelta(days=120))
+            analyzer.add_events(iter(events))
+            analyzer.summary()
+
+        benchmarks = {
+            "find_available_slots_14d": lambda: find_available_slots(
+                service, start, start + datetime.timedelta(days=14)
+            ),
+            "find_slots_in_window_90d": lambda: find_slots_in_window(window),
+            "availability_cache_apply_changes": apply_changes,
+            "utilization_analytics_120d": analytics,
+        }
+
+        with open(PERF_BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        with patch("main.get_now_jst", return_value=now):
+            measured = {name: self.measure(func) for name, func in benchmarks.items()}
+
+        if os.environ.get("UPDATE_PERF_BASELINE"):
+            baseline["benchmarks"] = {name: round(seconds, 4) for name, seconds in measured.items()}
+            with open(PERF_BASELINE_PATH, "w", encoding="utf-8") as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+                f.write("\n")
+            return
+
+        for name, seconds in measured.items():
+            with self.subTest(benchmark=name):
+                self.assertIn(name, baseline["benchmarks"])
+                limit = baseline["benchmarks"][name] * baseline["tolerance"]
+                self.assertLessEqual(
+                    seconds, limit,
+                    f"{name}: {seconds:.4f}s exceeds baseline limit {limit:.4f}s",
+                )
+
+
 if __name__ == "__main__":
     unittest.main()